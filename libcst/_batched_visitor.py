@@ -8,11 +8,15 @@ import inspect
 from typing import (
     TYPE_CHECKING,
     Callable,
+    Dict,
     Iterable,
     List,
     Mapping,
     MutableMapping,
     Optional,
+    Sequence,
+    Tuple,
+    Type,
     cast,
 )
 
@@ -26,6 +30,7 @@ if TYPE_CHECKING:
 
 VisitorMethod = Callable[["CSTNode"], None]
 _VisitorMethodCollection = Mapping[str, List[VisitorMethod]]
+_NO_VISITOR_METHODS: Sequence[VisitorMethod] = ()
 
 
 class BatchableCSTVisitor(CSTTypedVisitorFunctions, MetadataDependent):
@@ -123,6 +128,17 @@ class _BatchedCSTVisitor(CSTVisitor):
         self.visitor_methods = visitor_methods
         self.before_visit = before_visit
         self.after_leave = after_leave
+        # Every node gets visited and left, along with each of its attributes, so
+        # we look up the methods to call for each class of node once, rather than
+        # building the method names again for every node in the tree.
+        self._visit_methods: Dict[Type["CSTNode"], Sequence[VisitorMethod]] = {}
+        self._leave_methods: Dict[Type["CSTNode"], Sequence[VisitorMethod]] = {}
+        self._visit_attribute_methods: Dict[
+            Tuple[Type["CSTNode"], str], Sequence[VisitorMethod]
+        ] = {}
+        self._leave_attribute_methods: Dict[
+            Tuple[Type["CSTNode"], str], Sequence[VisitorMethod]
+        ] = {}
 
     def on_visit(self, node: "CSTNode") -> bool:
         """
@@ -131,8 +147,13 @@ class _BatchedCSTVisitor(CSTVisitor):
         before_visit = self.before_visit
         if before_visit is not None:
             before_visit(node)
-        type_name = type(node).__name__
-        for v in self.visitor_methods.get(f"visit_{type_name}", []):
+        node_type = type(node)
+        methods = self._visit_methods.get(node_type)
+        if methods is None:
+            methods = self._visit_methods[node_type] = self.visitor_methods.get(
+                f"visit_{node_type.__name__}", _NO_VISITOR_METHODS
+            )
+        for v in methods:
             v(node)
         return True
 
@@ -140,8 +161,13 @@ class _BatchedCSTVisitor(CSTVisitor):
         """
         Call appropriate leave methods on node after visiting children.
         """
-        type_name = type(original_node).__name__
-        for v in self.visitor_methods.get(f"leave_{type_name}", []):
+        node_type = type(original_node)
+        methods = self._leave_methods.get(node_type)
+        if methods is None:
+            methods = self._leave_methods[node_type] = self.visitor_methods.get(
+                f"leave_{node_type.__name__}", _NO_VISITOR_METHODS
+            )
+        for v in methods:
             v(original_node)
         after_leave = self.after_leave
         if after_leave is not None:
@@ -152,8 +178,13 @@ class _BatchedCSTVisitor(CSTVisitor):
         Call appropriate visit attribute methods on node before visiting
         attribute's children.
         """
-        type_name = type(node).__name__
-        for v in self.visitor_methods.get(f"visit_{type_name}_{attribute}", []):
+        key = (type(node), attribute)
+        methods = self._visit_attribute_methods.get(key)
+        if methods is None:
+            methods = self._visit_attribute_methods[key] = self.visitor_methods.get(
+                f"visit_{key[0].__name__}_{attribute}", _NO_VISITOR_METHODS
+            )
+        for v in methods:
             v(node)
 
     def on_leave_attribute(self, original_node: "CSTNode", attribute: str) -> None:
@@ -161,6 +192,11 @@ class _BatchedCSTVisitor(CSTVisitor):
         Call appropriate leave attribute methods on node after visiting
         attribute's children.
         """
-        type_name = type(original_node).__name__
-        for v in self.visitor_methods.get(f"leave_{type_name}_{attribute}", []):
+        key = (type(original_node), attribute)
+        methods = self._leave_attribute_methods.get(key)
+        if methods is None:
+            methods = self._leave_attribute_methods[key] = self.visitor_methods.get(
+                f"leave_{key[0].__name__}_{attribute}", _NO_VISITOR_METHODS
+            )
+        for v in methods:
             v(original_node)
@@ -465,7 +465,7 @@ generated_code.append("from typing_extensions import Literal")
 generated_code.append("import libcst as cst")
 generated_code.append("")
 generated_code.append(
-    "from libcst.matchers._matcher_base import BaseMatcherNode, DoNotCareSentinel, DoNotCare, OneOf, AllOf, DoesNotMatch, MatchIfTrue, MatchRegex, MatchMetadata, MatchMetadataIfTrue, ZeroOrMore, AtLeastN, ZeroOrOne, AtMostN, SaveMatchedNode, extract, extractall, findall, matches, replace"
+    "from libcst.matchers._matcher_base import BaseMatcherNode, DoNotCareSentinel, DoNotCare, OneOf, AllOf, DoesNotMatch, MatchIfTrue, MatchRegex, MatchMetadata, MatchMetadataIfTrue, ZeroOrMore, AtLeastN, ZeroOrOne, AtMostN, SaveMatchedNode, extract, extractall, find_and_extract_all, findall, findall_multi, findfirst, matches, replace, _intern"
 )
 all_exports.update(
     [
@@ -486,7 +486,10 @@ all_exports.update(
         "SaveMatchedNode",
         "extract",
         "extractall",
+        "find_and_extract_all",
         "findall",
+        "findall_multi",
+        "findfirst",
         "matches",
         "replace",
     ]
@@ -544,6 +547,7 @@ for node in all_libcst_nodes:
 
     generated_code.append("")
     generated_code.append("")
+    generated_code.append("@_intern")
     generated_code.append("@dataclass(frozen=True, eq=False, unsafe_hash=False)")
     generated_code.append(f'class {node.__name__}({", ".join(classes)}):')
     all_exports.add(node.__name__)
@@ -30,9 +30,13 @@ from libcst.matchers._matcher_base import (
     SaveMatchedNode,
     ZeroOrMore,
     ZeroOrOne,
+    _intern,
     extract,
     extractall,
+    find_and_extract_all,
     findall,
+    findall_multi,
+    findfirst,
     matches,
     replace,
 )
@@ -153,6 +157,7 @@ BaseParenthesizableWhitespaceMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Add(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -175,6 +180,7 @@ class Add(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AddAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -197,6 +203,7 @@ class AddAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class And(BaseBooleanOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -241,6 +248,7 @@ SemicolonMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AnnAssign(BaseSmallStatement, BaseMatcherNode):
     target: Union[
@@ -281,6 +289,7 @@ class AnnAssign(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Annotation(BaseMatcherNode):
     annotation: Union[
@@ -320,6 +329,7 @@ CommaMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Arg(BaseMatcherNode):
     value: Union[
@@ -392,6 +402,7 @@ NameOrTupleOrListMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AsName(BaseMatcherNode):
     name: Union[
@@ -427,6 +438,7 @@ SimpleWhitespaceMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Assert(BaseSmallStatement, BaseMatcherNode):
     test: Union[
@@ -469,6 +481,7 @@ AssignTargetMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Assign(BaseSmallStatement, BaseMatcherNode):
     targets: Union[
@@ -571,6 +584,7 @@ class Assign(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AssignEqual(BaseMatcherNode):
     whitespace_before: Union[
@@ -600,6 +614,7 @@ BaseAssignTargetExpressionMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AssignTarget(BaseMatcherNode):
     target: Union[
@@ -628,6 +643,7 @@ class AssignTarget(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Asynchronous(BaseMatcherNode):
     whitespace_after: Union[
@@ -656,6 +672,7 @@ RightParenMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Attribute(
     BaseAssignTargetExpression, BaseDelTargetExpression, BaseExpression, BaseMatcherNode
@@ -845,6 +862,7 @@ BaseAugOpMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class AugAssign(BaseSmallStatement, BaseMatcherNode):
     target: Union[
@@ -879,6 +897,7 @@ class AugAssign(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Await(BaseExpression, BaseMatcherNode):
     expression: Union[
@@ -1066,6 +1085,7 @@ BaseBinaryOpMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BinaryOperation(BaseExpression, BaseMatcherNode):
     left: Union[
@@ -1254,6 +1274,7 @@ class BinaryOperation(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitAnd(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1276,6 +1297,7 @@ class BitAnd(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitAndAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1298,6 +1320,7 @@ class BitAndAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitInvert(BaseUnaryOp, BaseMatcherNode):
     whitespace_after: Union[
@@ -1314,6 +1337,7 @@ class BitInvert(BaseUnaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitOr(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1336,6 +1360,7 @@ class BitOr(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitOrAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1358,6 +1383,7 @@ class BitOrAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitXor(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1380,6 +1406,7 @@ class BitXor(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BitXorAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -1407,6 +1434,7 @@ BaseBooleanOpMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class BooleanOperation(BaseExpression, BaseMatcherNode):
     left: Union[
@@ -1595,6 +1623,7 @@ class BooleanOperation(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Break(BaseSmallStatement, BaseMatcherNode):
     semicolon: Union[
@@ -1614,6 +1643,7 @@ class Break(BaseSmallStatement, BaseMatcherNode):
 ArgMatchType = Union["Arg", MetadataMatchType, MatchIfTrue[Callable[[cst.Arg], bool]]]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Call(BaseExpression, BaseMatcherNode):
     func: Union[
@@ -1885,6 +1915,7 @@ EmptyLineMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ClassDef(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     name: Union[
@@ -2318,6 +2349,7 @@ class ClassDef(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Colon(BaseMatcherNode):
     whitespace_before: Union[
@@ -2340,6 +2372,7 @@ class Colon(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Comma(BaseMatcherNode):
     whitespace_before: Union[
@@ -2365,6 +2398,7 @@ class Comma(BaseMatcherNode):
 strMatchType = Union[str, MetadataMatchType, MatchIfTrue[Callable[[str], bool]]]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Comment(BaseMatcherNode):
     value: Union[
@@ -2395,6 +2429,7 @@ AsynchronousOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class CompFor(BaseMatcherNode):
     target: Union[
@@ -2533,6 +2568,7 @@ class CompFor(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class CompIf(BaseMatcherNode):
     test: Union[
@@ -2568,6 +2604,7 @@ ComparisonTargetMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Comparison(BaseExpression, BaseMatcherNode):
     left: Union[
@@ -2829,6 +2866,7 @@ BaseCompOpMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ComparisonTarget(BaseMatcherNode):
     operator: Union[
@@ -2870,6 +2908,7 @@ SimpleStringOrFormattedStringOrConcatenatedStringMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ConcatenatedString(BaseExpression, BaseString, BaseMatcherNode):
     left: Union[
@@ -3058,6 +3097,7 @@ class ConcatenatedString(BaseExpression, BaseString, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Continue(BaseSmallStatement, BaseMatcherNode):
     semicolon: Union[
@@ -3088,6 +3128,7 @@ TrailingWhitespaceMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Decorator(BaseMatcherNode):
     decorator: Union[
@@ -3203,6 +3244,7 @@ BaseDelTargetExpressionMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Del(BaseSmallStatement, BaseMatcherNode):
     target: Union[
@@ -3248,6 +3290,7 @@ RightCurlyBraceMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Dict(BaseDict, BaseExpression, BaseMatcherNode):
     elements: Union[
@@ -3515,6 +3558,7 @@ CompForMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class DictComp(BaseComp, BaseDict, BaseExpression, BaseMatcherNode):
     key: Union[
@@ -3727,6 +3771,7 @@ class DictComp(BaseComp, BaseDict, BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class DictElement(BaseDictElement, BaseMatcherNode):
     key: Union[
@@ -3764,6 +3809,7 @@ class DictElement(BaseDictElement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Divide(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -3786,6 +3832,7 @@ class Divide(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class DivideAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -3808,6 +3855,7 @@ class DivideAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Dot(BaseMatcherNode):
     whitespace_before: Union[
@@ -3830,6 +3878,7 @@ class Dot(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Element(BaseElement, BaseMatcherNode):
     value: Union[
@@ -3849,6 +3898,7 @@ class Element(BaseElement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Ellipsis(BaseExpression, BaseMatcherNode):
     lpar: Union[
@@ -4019,6 +4069,7 @@ class Ellipsis(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Else(BaseMatcherNode):
     body: Union[
@@ -4133,6 +4184,7 @@ NewlineMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class EmptyLine(BaseMatcherNode):
     indent: Union[
@@ -4164,6 +4216,7 @@ class EmptyLine(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Equal(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -4194,6 +4247,7 @@ AsNameOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ExceptHandler(BaseMatcherNode):
     body: Union[
@@ -4314,6 +4368,7 @@ class ExceptHandler(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Expr(BaseSmallStatement, BaseMatcherNode):
     value: Union[
@@ -4336,6 +4391,7 @@ class Expr(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Finally(BaseMatcherNode):
     body: Union[
@@ -4438,6 +4494,7 @@ class Finally(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Float(BaseExpression, BaseNumber, BaseMatcherNode):
     value: Union[
@@ -4611,6 +4668,7 @@ class Float(BaseExpression, BaseNumber, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FloorDivide(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -4633,6 +4691,7 @@ class FloorDivide(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FloorDivideAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -4663,6 +4722,7 @@ ElseOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class For(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     target: Union[
@@ -4814,6 +4874,7 @@ BaseFormattedStringContentMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FormattedString(BaseExpression, BaseString, BaseMatcherNode):
     parts: Union[
@@ -5098,6 +5159,7 @@ AssignEqualOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FormattedStringExpression(BaseFormattedStringContent, BaseMatcherNode):
     expression: Union[
@@ -5466,6 +5528,7 @@ class FormattedStringExpression(BaseFormattedStringContent, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FormattedStringText(BaseFormattedStringContent, BaseMatcherNode):
     value: Union[
@@ -5479,6 +5542,7 @@ class FormattedStringText(BaseFormattedStringContent, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class From(BaseMatcherNode):
     item: Union[
@@ -5518,6 +5582,7 @@ AnnotationOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class FunctionDef(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     name: Union[
@@ -5819,6 +5884,7 @@ class FunctionDef(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class GeneratorExp(BaseComp, BaseExpression, BaseSimpleComp, BaseMatcherNode):
     elt: Union[
@@ -6006,6 +6072,7 @@ NameItemMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Global(BaseSmallStatement, BaseMatcherNode):
     names: Union[
@@ -6108,6 +6175,7 @@ class Global(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class GreaterThan(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -6130,6 +6198,7 @@ class GreaterThan(BaseCompOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class GreaterThanEqual(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -6161,6 +6230,7 @@ IfOrElseOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class If(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     test: Union[
@@ -6281,6 +6351,7 @@ class If(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class IfExp(BaseExpression, BaseMatcherNode):
     test: Union[
@@ -6493,6 +6564,7 @@ class IfExp(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Imaginary(BaseExpression, BaseNumber, BaseMatcherNode):
     value: Union[
@@ -6671,6 +6743,7 @@ ImportAliasMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Import(BaseSmallStatement, BaseMatcherNode):
     names: Union[
@@ -6781,6 +6854,7 @@ AttributeOrNameMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ImportAlias(BaseMatcherNode):
     name: Union[
@@ -6827,6 +6901,7 @@ RightParenOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ImportFrom(BaseSmallStatement, BaseMatcherNode):
     module: Union[
@@ -7239,6 +7314,7 @@ class ImportFrom(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ImportStar(BaseMatcherNode):
     metadata: Union[
@@ -7249,6 +7325,7 @@ class ImportStar(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class In(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -7276,6 +7353,7 @@ BaseStatementMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class IndentedBlock(BaseSuite, BaseMatcherNode):
     body: Union[
@@ -7458,6 +7536,7 @@ class IndentedBlock(BaseSuite, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Index(BaseSlice, BaseMatcherNode):
     value: Union[
@@ -7474,6 +7553,7 @@ class Index(BaseSlice, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Integer(BaseExpression, BaseNumber, BaseMatcherNode):
     value: Union[
@@ -7647,6 +7727,7 @@ class Integer(BaseExpression, BaseNumber, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Is(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -7669,6 +7750,7 @@ class Is(BaseCompOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class IsNot(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -7702,6 +7784,7 @@ ColonMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Lambda(BaseExpression, BaseMatcherNode):
     params: Union[
@@ -7893,6 +7976,7 @@ class Lambda(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LeftCurlyBrace(BaseMatcherNode):
     whitespace_after: Union[
@@ -7909,6 +7993,7 @@ class LeftCurlyBrace(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LeftParen(BaseMatcherNode):
     whitespace_after: Union[
@@ -7925,6 +8010,7 @@ class LeftParen(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LeftShift(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -7947,6 +8033,7 @@ class LeftShift(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LeftShiftAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -7969,6 +8056,7 @@ class LeftShiftAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LeftSquareBracket(BaseMatcherNode):
     whitespace_after: Union[
@@ -7985,6 +8073,7 @@ class LeftSquareBracket(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LessThan(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8007,6 +8096,7 @@ class LessThan(BaseCompOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class LessThanEqual(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8044,6 +8134,7 @@ RightSquareBracketMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class List(
     BaseAssignTargetExpression,
@@ -8312,6 +8403,7 @@ class List(
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ListComp(BaseComp, BaseExpression, BaseList, BaseSimpleComp, BaseMatcherNode):
     elt: Union[
@@ -8506,6 +8598,7 @@ class ListComp(BaseComp, BaseExpression, BaseList, BaseSimpleComp, BaseMatcherNo
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class MatrixMultiply(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8528,6 +8621,7 @@ class MatrixMultiply(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class MatrixMultiplyAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8550,6 +8644,7 @@ class MatrixMultiplyAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Minus(BaseUnaryOp, BaseMatcherNode):
     whitespace_after: Union[
@@ -8576,6 +8671,7 @@ SimpleStatementLineOrBaseCompoundStatementMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Module(BaseMatcherNode):
     body: Union[
@@ -8924,6 +9020,7 @@ class Module(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Modulo(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8946,6 +9043,7 @@ class Modulo(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ModuloAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8968,6 +9066,7 @@ class ModuloAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Multiply(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -8990,6 +9089,7 @@ class Multiply(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class MultiplyAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -9012,6 +9112,7 @@ class MultiplyAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Name(
     BaseAssignTargetExpression, BaseDelTargetExpression, BaseExpression, BaseMatcherNode
@@ -9187,6 +9288,7 @@ class Name(
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class NameItem(BaseMatcherNode):
     name: Union[
@@ -9203,6 +9305,7 @@ class NameItem(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class NamedExpr(BaseExpression, BaseMatcherNode):
     target: Union[
@@ -9397,6 +9500,7 @@ class NamedExpr(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Newline(BaseMatcherNode):
     value: Union[
@@ -9413,6 +9517,7 @@ class Newline(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Nonlocal(BaseSmallStatement, BaseMatcherNode):
     names: Union[
@@ -9515,6 +9620,7 @@ class Nonlocal(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Not(BaseUnaryOp, BaseMatcherNode):
     whitespace_after: Union[
@@ -9531,6 +9637,7 @@ class Not(BaseUnaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class NotEqual(BaseCompOp, BaseMatcherNode):
     value: Union[
@@ -9556,6 +9663,7 @@ class NotEqual(BaseCompOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class NotIn(BaseCompOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -9584,6 +9692,7 @@ class NotIn(BaseCompOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Or(BaseBooleanOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -9606,6 +9715,7 @@ class Or(BaseBooleanOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Param(BaseMatcherNode):
     name: Union[
@@ -9655,6 +9765,7 @@ class Param(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ParamSlash(BaseMatcherNode):
     comma: Union[
@@ -9668,6 +9779,7 @@ class ParamSlash(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ParamStar(BaseMatcherNode):
     comma: Union[
@@ -9701,6 +9813,7 @@ ParamSlashMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Parameters(BaseMatcherNode):
     params: Union[
@@ -9969,6 +10082,7 @@ class Parameters(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class ParenthesizedWhitespace(BaseParenthesizableWhitespace, BaseMatcherNode):
     first_line: Union[
@@ -10074,6 +10188,7 @@ class ParenthesizedWhitespace(BaseParenthesizableWhitespace, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Pass(BaseSmallStatement, BaseMatcherNode):
     semicolon: Union[
@@ -10090,6 +10205,7 @@ class Pass(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Plus(BaseUnaryOp, BaseMatcherNode):
     whitespace_after: Union[
@@ -10106,6 +10222,7 @@ class Plus(BaseUnaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Power(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -10128,6 +10245,7 @@ class Power(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class PowerAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -10158,6 +10276,7 @@ FromOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Raise(BaseSmallStatement, BaseMatcherNode):
     exc: Union[
@@ -10192,6 +10311,7 @@ class Raise(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Return(BaseSmallStatement, BaseMatcherNode):
     value: Union[
@@ -10220,6 +10340,7 @@ class Return(BaseSmallStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class RightCurlyBrace(BaseMatcherNode):
     whitespace_before: Union[
@@ -10236,6 +10357,7 @@ class RightCurlyBrace(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class RightParen(BaseMatcherNode):
     whitespace_before: Union[
@@ -10252,6 +10374,7 @@ class RightParen(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class RightShift(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -10274,6 +10397,7 @@ class RightShift(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class RightShiftAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -10296,6 +10420,7 @@ class RightShiftAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class RightSquareBracket(BaseMatcherNode):
     whitespace_before: Union[
@@ -10312,6 +10437,7 @@ class RightSquareBracket(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Semicolon(BaseMatcherNode):
     whitespace_before: Union[
@@ -10334,6 +10460,7 @@ class Semicolon(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Set(BaseExpression, BaseSet, BaseMatcherNode):
     elements: Union[
@@ -10596,6 +10723,7 @@ class Set(BaseExpression, BaseSet, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SetComp(BaseComp, BaseExpression, BaseSet, BaseSimpleComp, BaseMatcherNode):
     elt: Union[
@@ -10797,6 +10925,7 @@ BaseSmallStatementMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SimpleStatementLine(BaseStatement, BaseMatcherNode):
     body: Union[
@@ -10973,6 +11102,7 @@ class SimpleStatementLine(BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SimpleStatementSuite(BaseSuite, BaseMatcherNode):
     body: Union[
@@ -11075,6 +11205,7 @@ class SimpleStatementSuite(BaseSuite, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SimpleString(BaseExpression, BaseString, BaseMatcherNode):
     value: Union[
@@ -11248,6 +11379,7 @@ class SimpleString(BaseExpression, BaseString, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SimpleWhitespace(BaseParenthesizableWhitespace, BaseMatcherNode):
     value: Union[
@@ -11261,6 +11393,7 @@ class SimpleWhitespace(BaseParenthesizableWhitespace, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Slice(BaseSlice, BaseMatcherNode):
     lower: Union[
@@ -11295,6 +11428,7 @@ class Slice(BaseSlice, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class StarredDictElement(BaseDictElement, BaseMatcherNode):
     value: Union[
@@ -11320,6 +11454,7 @@ class StarredDictElement(BaseDictElement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class StarredElement(BaseElement, BaseMatcherNode):
     value: Union[
@@ -11512,6 +11647,7 @@ SubscriptElementMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Subscript(
     BaseAssignTargetExpression, BaseDelTargetExpression, BaseExpression, BaseMatcherNode
@@ -11793,6 +11929,7 @@ BaseSliceMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SubscriptElement(BaseMatcherNode):
     slice: Union[
@@ -11812,6 +11949,7 @@ class SubscriptElement(BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Subtract(BaseBinaryOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -11834,6 +11972,7 @@ class Subtract(BaseBinaryOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class SubtractAssign(BaseAugOp, BaseMatcherNode):
     whitespace_before: Union[
@@ -11856,6 +11995,7 @@ class SubtractAssign(BaseAugOp, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class TrailingWhitespace(BaseMatcherNode):
     whitespace: Union[
@@ -11895,6 +12035,7 @@ FinallyOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Try(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     body: Union[
@@ -12089,6 +12230,7 @@ class Try(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Tuple(
     BaseAssignTargetExpression, BaseDelTargetExpression, BaseExpression, BaseMatcherNode
@@ -12346,6 +12488,7 @@ BaseUnaryOpMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class UnaryOperation(BaseExpression, BaseMatcherNode):
     operator: Union[
@@ -12528,6 +12671,7 @@ class UnaryOperation(BaseExpression, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class While(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     test: Union[
@@ -12653,6 +12797,7 @@ WithItemMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class With(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     items: Union[
@@ -12847,6 +12992,7 @@ class With(BaseCompoundStatement, BaseStatement, BaseMatcherNode):
     ] = DoNotCare()
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class WithItem(BaseMatcherNode):
     item: Union[
@@ -12881,6 +13027,7 @@ BaseExpressionOrFromOrNoneMatchType = Union[
 ]
 
 
+@_intern
 @dataclass(frozen=True, eq=False, unsafe_hash=False)
 class Yield(BaseExpression, BaseMatcherNode):
     value: Union[
@@ -13254,7 +13401,10 @@ __all__ = [
     "call_if_not_inside",
     "extract",
     "extractall",
+    "find_and_extract_all",
     "findall",
+    "findall_multi",
+    "findfirst",
     "leave",
     "matches",
     "replace",
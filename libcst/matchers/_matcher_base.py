@@ -8,23 +8,32 @@ import collections.abc
 import copy
 import inspect
 import re
-from dataclasses import fields
+import sys
+import weakref
+from dataclasses import fields, is_dataclass
 from enum import Enum, auto
+from itertools import chain
 from typing import (
     Callable,
+    Collection,
     Dict,
+    FrozenSet,
     Generic,
+    Hashable,
+    Iterable,
     List,
     Mapping,
     NoReturn,
     Optional,
     Pattern,
     Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
     Union,
     cast,
+    get_type_hints,
 )
 
 import libcst
@@ -47,6 +56,10 @@ class DoNotCareSentinel(Enum):
         return "DoNotCare()"
 
 
+# The one and only DoNotCareSentinel. Matching checks attributes against this by
+# identity, which is cheaper than an isinstance check or an enum member lookup.
+_DONOTCARE: DoNotCareSentinel = DoNotCareSentinel.DEFAULT
+
 _MatcherT = TypeVar("_MatcherT", covariant=True)
 _CallableT = TypeVar("_CallableT", bound="Callable", covariant=True)
 _BaseMatcherNodeSelfT = TypeVar("_BaseMatcherNodeSelfT", bound="BaseMatcherNode")
@@ -56,6 +69,158 @@ _MetadataValueT = TypeVar("_MetadataValueT")
 
 _METADATA_MISSING_SENTINEL = object()
 
+# The sentinels that a tree can be instead of a node. These are enums, which can't
+# be subclassed, so checking the type directly is the same as isinstance.
+_TREE_SENTINEL_TYPES: FrozenSet[type] = frozenset({RemovalSentinel, MaybeSentinel})
+
+# How _attribute_matches should treat a matcher attribute. Concrete matchers work
+# these out once when they are constructed so that matching against each node
+# can dispatch on an int instead of running through a chain of isinstance checks.
+_KIND_NODE = 0
+_KIND_DONOTCARE = 1
+_KIND_INVERSE = 2
+_KIND_EXTRACT = 3
+_KIND_MATCH_IF_TRUE = 4
+_KIND_ONEOF = 5
+_KIND_ALLOF = 6
+_KIND_SEQUENCE = 7
+_KIND_IDENTITY = 8
+_KIND_EQUALITY = 9
+_KIND_METADATA = 10
+_KIND_METADATA_IF_TRUE = 11
+# Only attributes of concrete matchers are classified as the following kinds,
+# see _classify_field. A sequence without any wildcards or captures, which
+# matches element by element.
+_KIND_FIXED_SEQUENCE = 12
+# A DoesNotMatch of None, a bool or a string, which are matched with the inverse
+# comparison rather than by inverting the result of matching the wrapped value.
+_KIND_NOT_IDENTITY = 13
+_KIND_NOT_EQUALITY = 14
+
+# Kinds that compare a plain value rather than walking into a matcher.
+_LEAF_KINDS: FrozenSet[int] = frozenset(
+    (_KIND_IDENTITY, _KIND_EQUALITY, _KIND_NOT_IDENTITY, _KIND_NOT_EQUALITY)
+)
+
+# Match results are only cached when a matcher tree contains more than this many
+# branching matchers (OneOf options and sequence wildcards). Below that, there is
+# little redundant evaluation to save and the cache bookkeeping costs more than
+# it saves.
+_MEMOIZE_THRESHOLD = 1
+
+
+def _memoization_info(children: Iterable[object]) -> Tuple[bool, int]:
+    """
+    Given the direct children of a matcher, returns whether the results of that
+    matcher can be cached, along with the number of branching matchers found in
+    the subtree. Sequences of matchers are treated as a list of children.
+    """
+    memoizable = True
+    branches = 0
+    for child in children:
+        if isinstance(child, collections.abc.Sequence) and not isinstance(child, str):
+            child_memoizable, child_branches = _memoization_info(child)
+        else:
+            child_memoizable = getattr(child, "_memoizable", True)
+            child_branches = getattr(child, "_branches", 0)
+        memoizable = memoizable and child_memoizable
+        branches += child_branches
+    return memoizable, branches
+
+
+def _match_order(
+    options: Sequence[_OtherNodeT], memoizable: bool
+) -> Sequence[_OtherNodeT]:
+    """
+    Given the options of a :class:`OneOf` or :class:`AllOf`, returns them in the
+    order that they should be tried in when matching. When none of the options
+    capture anything or call into user code, the result doesn't depend on the
+    order, so we try the cheapest options first to rule out or accept a node with
+    as little work as possible. Otherwise, the options keep their given order.
+    """
+    if not memoizable:
+        return options
+    return tuple(
+        sorted(
+            options,
+            key=lambda option: (
+                0
+                if option is None or isinstance(option, (bool, str))
+                else 1 + getattr(option, "_branches", 0)
+            ),
+        )
+    )
+
+
+# Canonical instances of the concrete matcher classes decorated with _intern, keyed
+# on their class and constructor arguments. Concrete matchers are immutable, so
+# identical matchers can share one instance, which lets identity based caches such
+# as the memoization above hit more often.
+_INTERNED_MATCHERS: "weakref.WeakValueDictionary[Hashable, BaseMatcherNode]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _intern_key(
+    cls: Type["BaseMatcherNode"], args: Sequence[object], kwargs: Mapping[str, object],
+) -> Optional[Hashable]:
+    """
+    Returns the key that a concrete matcher constructed with the given arguments is
+    interned under, or ``None`` if it can't be interned.
+    """
+    if not args and not kwargs:
+        # Copying and unpickling call __new__ without any arguments and then
+        # overwrite the instance's state, so these must always be fresh instances.
+        return None
+    # Include the type of each argument so that values which compare equal, such
+    # as True and 1, don't collide.
+    key = (
+        cls,
+        tuple((type(arg), arg) for arg in args),
+        tuple(sorted((name, type(arg), arg) for name, arg in kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        # Something was unhashable, such as a list of matchers.
+        return None
+    return key
+
+
+def _intern(cls: Type[_BaseMatcherNodeSelfT]) -> Type[_BaseMatcherNodeSelfT]:
+    """
+    Class decorator which makes constructing a concrete matcher class with the same
+    arguments as an existing, live instance return that instance instead of a new
+    one. This must be applied on top of the ``dataclass`` decorator.
+    """
+    init = cls.__init__
+
+    def __new__(
+        new_cls: Type[_BaseMatcherNodeSelfT], *args: object, **kwargs: object
+    ) -> _BaseMatcherNodeSelfT:
+        # Subclasses of an interned class don't share its instances.
+        key = _intern_key(new_cls, args, kwargs) if new_cls is cls else None
+        if key is None:
+            return object.__new__(new_cls)
+        instance = _INTERNED_MATCHERS.get(key)
+        if instance is None:
+            instance = object.__new__(new_cls)
+            _INTERNED_MATCHERS[key] = instance
+        return cast(_BaseMatcherNodeSelfT, instance)
+
+    def __init__(self: _BaseMatcherNodeSelfT, *args: object, **kwargs: object) -> None:
+        # Python calls __init__ on whatever __new__ returns, so skip it for an
+        # instance that we handed out before, since its state is already set up
+        # and other callers may be holding on to it.
+        if "_match_fields" not in self.__dict__:
+            init(self, *args, **kwargs)
+
+    # pyre-ignore[8] We're deliberately replacing the constructor.
+    cls.__new__ = __new__
+    # pyre-ignore[8] We're deliberately replacing the constructor.
+    cls.__init__ = __init__
+    return cls
+
 
 class BaseMatcherNode:
     """
@@ -66,26 +231,102 @@ class BaseMatcherNode:
     several concrete matchers as options.
     """
 
+    # Concrete matchers are dataclasses and keep their own __dict__, but the
+    # special matchers that subclass us declare slots and can only drop theirs
+    # if every base class does too.
+    __slots__ = ()
+
+    _MATCH_KIND: int = _KIND_NODE
+
+    # Names of the dataclass fields on a concrete matcher class, see _get_field_names.
+    _field_names: Tuple[str, ...]
+
+    # The LibCST node class that a concrete matcher class matches, see
+    # _get_node_type.
+    _node_type: Optional[Type[libcst.CSTNode]]
+
+    # Computed when a concrete matcher is constructed, see __post_init__.
+    _memoizable: bool
+    _branches: int
+    _match_fields: Tuple[Tuple[str, int, object], ...]
+    _match_metadata: object
+
+    # Set the first time that matches() is called with this matcher, see
+    # _compiled_matches.
+    _compiled: Optional[Callable[[object], bool]]
+
+    @classmethod
+    def _get_field_names(cls) -> Tuple[str, ...]:
+        # The dataclass decorator only runs after a class is created, so we can't
+        # compute this in __init_subclass__. Instead, cache it on the class the
+        # first time it is needed, since dataclasses.fields() builds a new tuple
+        # on every call. We look in the class's own namespace so that subclasses
+        # don't pick up the field names of their parent.
+        names = cls.__dict__.get("_field_names")
+        if names is None:
+            names = tuple(field.name for field in fields(cls))
+            cls._field_names = names
+        return names
+
+    @classmethod
+    def _get_node_type(cls) -> Optional[Type[libcst.CSTNode]]:
+        # Matchers are generated from the LibCST nodes and share their names, so
+        # look the node class up once and let matching compare types directly
+        # instead of comparing class names for every node. Cached on the class
+        # in the same way as _get_field_names.
+        if "_node_type" not in cls.__dict__:
+            node_type = getattr(libcst, cls.__name__, None)
+            if not (
+                isinstance(node_type, type) and issubclass(node_type, libcst.CSTNode)
+            ):
+                node_type = None
+            cls._node_type = node_type
+        return cls.__dict__["_node_type"]
+
+    def __post_init__(self) -> None:
+        # Concrete matchers are frozen dataclasses, so we sidestep the frozen
+        # __setattr__ in order to record what we know about the matcher tree.
+        values = [(name, getattr(self, name)) for name in self._get_field_names()]
+        memoizable, branches = _memoization_info(value for _, value in values)
+        object.__setattr__(self, "_memoizable", memoizable)
+        object.__setattr__(self, "_branches", branches)
+        # Work out once which attributes constrain a match, so that matching
+        # against each node doesn't need to reflect over the dataclass and skip
+        # past every attribute that we don't care about.
+        match_fields = [
+            (name, *_classify_field(value))
+            for name, value in values
+            # The metadata field is special and is matched separately.
+            if name not in ("_metadata", "metadata") and value is not _DONOTCARE
+        ]
+        # Check the plain values first, since they are the cheapest to compare
+        # and most often rule a node out. They never capture anything or call
+        # into user code, so moving them ahead doesn't change the result.
+        match_fields.sort(key=lambda field: field[1] not in _LEAF_KINDS)
+        object.__setattr__(self, "_match_fields", tuple(match_fields))
+        object.__setattr__(
+            self, "_match_metadata", getattr(self, "metadata", _DONOTCARE)
+        )
+        self._get_node_type()
+
     def __or__(
         self: _BaseMatcherNodeSelfT, other: _OtherNodeT
     ) -> "OneOf[Union[_BaseMatcherNodeSelfT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below OneOf is type OneOf[object]
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
         # even though it has the types passed into it.
-        return cast(
-            OneOf[Union[_BaseMatcherNodeSelfT, _OtherNodeT]], OneOf(self, other)
-        )
+        return OneOf(self, other)
 
     def __and__(
         self: _BaseMatcherNodeSelfT, other: _OtherNodeT
     ) -> "AllOf[Union[_BaseMatcherNodeSelfT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below AllOf is type AllOf[object]
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
         # even though it has the types passed into it.
-        return cast(
-            AllOf[Union[_BaseMatcherNodeSelfT, _OtherNodeT]], AllOf(self, other)
-        )
+        return AllOf(self, other)
 
     def __invert__(self: _BaseMatcherNodeSelfT) -> "_BaseMatcherNodeSelfT":
-        return cast(_BaseMatcherNodeSelfT, _InverseOf(self))
+        # pyre-ignore[7] We intentionally lie here, for the same reason given in
+        # the documentation for DoesNotMatch.
+        return _InverseOf(self)
 
 
 def DoNotCare() -> DoNotCareSentinel:
@@ -101,7 +342,30 @@ def DoNotCare() -> DoNotCareSentinel:
 
         m.Call(args=[m.DoNotCare(), m.DoNotCare(), m.DoNotCare()])
     """
-    return DoNotCareSentinel.DEFAULT
+    return _DONOTCARE
+
+
+def _flatten_options(
+    options: Iterable[_MatcherT],
+    flatten: Type[Union["OneOf[_MatcherT]", "AllOf[_MatcherT]"]],
+    forbid: Type[Union["OneOf[_MatcherT]", "AllOf[_MatcherT]"]],
+) -> Dict[int, _MatcherT]:
+    """
+    Flattens the options of any nested ``flatten`` matchers into a single mapping
+    of option identity to option, in order. Any option that we already have is
+    dropped, since evaluating the same matcher twice can't change the result.
+    """
+
+    def _expand(option: _MatcherT) -> Sequence[_MatcherT]:
+        if isinstance(option, forbid):
+            raise Exception("Cannot use AllOf and OneOf in combination!")
+        # pyre-ignore Pyre doesn't know that option is a flatten here.
+        return option.options if isinstance(option, flatten) else (option,)
+
+    return {
+        id(option): option
+        for option in chain.from_iterable(_expand(option) for option in options)
+    }
 
 
 class OneOf(Generic[_MatcherT], BaseMatcherNode):
@@ -132,16 +396,32 @@ class OneOf(Generic[_MatcherT], BaseMatcherNode):
 
     """
 
+    __slots__ = (
+        "_options",
+        "_match_options",
+        "_option_ids",
+        "_memoizable",
+        "_branches",
+        "_uninverted",
+        "_compiled",
+        "__weakref__",
+    )
+
+    _MATCH_KIND: int = _KIND_ONEOF
+
     def __init__(self, *options: Union[_MatcherT, "OneOf[_MatcherT]"]) -> None:
-        actual_options: List[_MatcherT] = []
-        for option in options:
-            if isinstance(option, AllOf):
-                raise Exception("Cannot use AllOf and OneOf in combination!")
-            elif isinstance(option, OneOf):
-                actual_options.extend(option.options)
-            else:
-                actual_options.append(option)
-        self._options: Sequence[_MatcherT] = tuple(actual_options)
+        actual_options = _flatten_options(options, OneOf, AllOf)
+        self._options: Sequence[_MatcherT] = tuple(actual_options.values())
+        self._option_ids: FrozenSet[int] = frozenset(actual_options)
+        memoizable, branches = _memoization_info(self._options)
+        self._memoizable: bool = memoizable
+        self._match_options: Sequence[_MatcherT] = _match_order(
+            self._options, memoizable
+        )
+        self._branches: int = branches + 1
+        # Set when this was produced by inverting an AllOf, so that inverting
+        # it again hands back the original instead of growing a new tree.
+        self._uninverted: Optional["AllOf[_MatcherT]"] = None
 
     @property
     def options(self) -> Sequence[_MatcherT]:
@@ -153,16 +433,35 @@ class OneOf(Generic[_MatcherT], BaseMatcherNode):
         return self._options
 
     def __or__(self, other: _OtherNodeT) -> "OneOf[Union[_MatcherT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below OneOf is type OneOf[object]
+        if id(other) in self._option_ids:
+            # We already have this option, so there's nothing to add.
+            # pyre-ignore[7] Adding an option that we have doesn't change our type.
+            return self
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
         # even though it has the types passed into it.
-        return cast(OneOf[Union[_MatcherT, _OtherNodeT]], OneOf(self, other))
+        return OneOf(self, other)
 
     def __and__(self, other: _OtherNodeT) -> NoReturn:
         raise Exception("Cannot use AllOf and OneOf in combination!")
 
     def __invert__(self) -> "AllOf[_MatcherT]":
+        if self._uninverted is not None:
+            return self._uninverted
         # Invert using De Morgan's Law so we don't have to complicate types.
-        return cast(AllOf[_MatcherT], AllOf(*[DoesNotMatch(m) for m in self._options]))
+        inverse = AllOf(*[DoesNotMatch(m) for m in self._options])
+        inverse._uninverted = self
+        return inverse
+
+    def __eq__(self, other: object) -> bool:
+        # Special matchers compare by structure like concrete matchers do, so that
+        # identical concrete matchers that contain them are interned together and
+        # share a compiled predicate, see _compiled_matches. Special matchers are
+        # never interned themselves, since __invert__ links an instance to its
+        # inverse.
+        return isinstance(other, OneOf) and self._options == other._options
+
+    def __hash__(self) -> int:
+        return hash((OneOf, self._options))
 
     def __repr__(self) -> str:
         return f"OneOf({', '.join([repr(o) for o in self._options])})"
@@ -206,16 +505,32 @@ class AllOf(Generic[_MatcherT], BaseMatcherNode):
 
     """
 
+    __slots__ = (
+        "_options",
+        "_match_options",
+        "_option_ids",
+        "_memoizable",
+        "_branches",
+        "_uninverted",
+        "_compiled",
+        "__weakref__",
+    )
+
+    _MATCH_KIND: int = _KIND_ALLOF
+
     def __init__(self, *options: Union[_MatcherT, "AllOf[_MatcherT]"]) -> None:
-        actual_options: List[_MatcherT] = []
-        for option in options:
-            if isinstance(option, OneOf):
-                raise Exception("Cannot use AllOf and OneOf in combination!")
-            elif isinstance(option, AllOf):
-                actual_options.extend(option.options)
-            else:
-                actual_options.append(option)
-        self._options: Sequence[_MatcherT] = tuple(actual_options)
+        actual_options = _flatten_options(options, AllOf, OneOf)
+        self._options: Sequence[_MatcherT] = tuple(actual_options.values())
+        self._option_ids: FrozenSet[int] = frozenset(actual_options)
+        memoizable, branches = _memoization_info(self._options)
+        self._memoizable: bool = memoizable
+        self._match_options: Sequence[_MatcherT] = _match_order(
+            self._options, memoizable
+        )
+        self._branches: int = branches
+        # Set when this was produced by inverting a OneOf, so that inverting
+        # it again hands back the original instead of growing a new tree.
+        self._uninverted: Optional["OneOf[_MatcherT]"] = None
 
     @property
     def options(self) -> Sequence[_MatcherT]:
@@ -230,18 +545,63 @@ class AllOf(Generic[_MatcherT], BaseMatcherNode):
         raise Exception("Cannot use AllOf and OneOf in combination!")
 
     def __and__(self, other: _OtherNodeT) -> "AllOf[Union[_MatcherT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below AllOf is type AllOf[object]
+        if id(other) in self._option_ids:
+            # We already have this option, so there's nothing to add.
+            # pyre-ignore[7] Adding an option that we have doesn't change our type.
+            return self
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
         # even though it has the types passed into it.
-        return cast(AllOf[Union[_MatcherT, _OtherNodeT]], AllOf(self, other))
+        return AllOf(self, other)
 
     def __invert__(self) -> "OneOf[_MatcherT]":
+        if self._uninverted is not None:
+            return self._uninverted
         # Invert using De Morgan's Law so we don't have to complicate types.
-        return cast(OneOf[_MatcherT], OneOf(*[DoesNotMatch(m) for m in self._options]))
+        inverse = OneOf(*[DoesNotMatch(m) for m in self._options])
+        inverse._uninverted = self
+        return inverse
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AllOf) and self._options == other._options
+
+    def __hash__(self) -> int:
+        return hash((AllOf, self._options))
 
     def __repr__(self) -> str:
         return f"AllOf({', '.join([repr(o) for o in self._options])})"
 
 
+def _copy_matcher_fields(wrapper: object, matcher: object) -> None:
+    """
+    Copies the attributes of a concrete matcher onto a transparent wrapper such as
+    :class:`_InverseOf`, so that reading them doesn't need to miss on the wrapper
+    and fall back to its ``__getattr__``. Attributes that the wrapper defines itself
+    are skipped so that the wrapper's own API keeps working.
+    """
+    if isinstance(matcher, BaseMatcherNode) and is_dataclass(matcher):
+        wrapper_cls = type(wrapper)
+        for name in matcher._get_field_names():
+            if not hasattr(wrapper_cls, name):
+                wrapper.__dict__[name] = getattr(matcher, name)
+
+
+# Tags the identity of an unhashable value in _comparison_key.
+_UNHASHABLE = object()
+
+
+def _comparison_key(value: object) -> object:
+    """
+    Returns what a special matcher compares and hashes in place of a callable or a
+    metadata value that it holds. Unhashable ones, such as a set of qualified names,
+    are compared by identity so that the matcher itself can still be hashed.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return (_UNHASHABLE, id(value))
+    return value
+
+
 class _InverseOf(Generic[_MatcherT]):
     """
     Matcher that inverts the match result of its child. You can also construct a
@@ -262,8 +622,18 @@ class _InverseOf(Generic[_MatcherT]):
 
     """
 
+    # Fields of a wrapped concrete matcher are copied into our __dict__, see
+    # _copy_matcher_fields, so unlike the other special matchers we keep one.
+    __slots__ = ("_matcher", "_memoizable", "_branches", "__dict__", "__weakref__")
+
+    _MATCH_KIND: int = _KIND_INVERSE
+
     def __init__(self, matcher: _MatcherT) -> None:
         self._matcher: _MatcherT = matcher
+        memoizable, branches = _memoization_info((matcher,))
+        self._memoizable: bool = memoizable
+        self._branches: int = branches
+        _copy_matcher_fields(self, matcher)
 
     @property
     def matcher(self) -> _MatcherT:
@@ -274,24 +644,31 @@ class _InverseOf(Generic[_MatcherT]):
         return self._matcher
 
     def __or__(self, other: _OtherNodeT) -> "OneOf[Union[_MatcherT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below OneOf is type OneOf[object]
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
         # even though it has the types passed into it.
-        return cast(OneOf[Union[_MatcherT, _OtherNodeT]], OneOf(self, other))
+        return OneOf(self, other)
 
     def __and__(self, other: _OtherNodeT) -> "AllOf[Union[_MatcherT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below AllOf is type AllOf[object]
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
         # even though it has the types passed into it.
-        return cast(AllOf[Union[_MatcherT, _OtherNodeT]], AllOf(self, other))
+        return AllOf(self, other)
 
     def __getattr__(self, key: str) -> object:
         # We lie about types to make _InverseOf appear transparent. So, its conceivable
         # that somebody might try to dereference an attribute on the _MatcherT wrapped
-        # node and become surprised that it doesn't work.
+        # node and become surprised that it doesn't work. Fields of concrete matchers
+        # are copied onto us up front, so this only handles everything else.
         return getattr(self._matcher, key)
 
     def __invert__(self) -> _MatcherT:
         return self._matcher
 
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _InverseOf) and self._matcher == other._matcher
+
+    def __hash__(self) -> int:
+        return hash((_InverseOf, self._matcher))
+
     def __repr__(self) -> str:
         return f"DoesNotMatch({repr(self._matcher)})"
 
@@ -321,9 +698,27 @@ class _ExtractMatchingNode(Generic[_MatcherT]):
         )
     """
 
+    # Fields of a wrapped concrete matcher are copied into our __dict__, see
+    # _copy_matcher_fields, so unlike the other special matchers we keep one.
+    __slots__ = (
+        "_matcher",
+        "_name",
+        "_memoizable",
+        "_branches",
+        "__dict__",
+        "__weakref__",
+    )
+
+    _MATCH_KIND: int = _KIND_EXTRACT
+
     def __init__(self, matcher: _MatcherT, name: str) -> None:
         self._matcher: _MatcherT = matcher
         self._name: str = name
+        # Captures depend on the node that matched, not only on whether it
+        # matched, so a cached result would drop them.
+        self._memoizable: bool = False
+        self._branches: int = _memoization_info((matcher,))[1]
+        _copy_matcher_fields(self, matcher)
 
     @property
     def matcher(self) -> _MatcherT:
@@ -343,9 +738,9 @@ class _ExtractMatchingNode(Generic[_MatcherT]):
         return self._name
 
     def __or__(self, other: _OtherNodeT) -> "OneOf[Union[_MatcherT, _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below OneOf is type OneOf[object]
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
         # even though it has the types passed into it.
-        return cast(OneOf[Union[_MatcherT, _OtherNodeT]], OneOf(self, other))
+        return OneOf(self, other)
 
     def __and__(self, other: _OtherNodeT) -> "AllOf[Union[_MatcherT, _OtherNodeT]]":
         # This doesn't make sense. If we have multiple SaveMatchedNode captures
@@ -361,6 +756,8 @@ class _ExtractMatchingNode(Generic[_MatcherT]):
         # We lie about types to make _ExtractMatchingNode appear transparent. So,
         # its conceivable that somebody might try to dereference an attribute on
         # the _MatcherT wrapped node and become surprised that it doesn't work.
+        # Fields of concrete matchers are copied onto us up front, so this only
+        # handles everything else.
         return getattr(self._matcher, key)
 
     def __invert__(self) -> "_MatcherT":
@@ -371,6 +768,16 @@ class _ExtractMatchingNode(Generic[_MatcherT]):
             "around your inversion itself"
         )
 
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _ExtractMatchingNode)
+            and self._name == other._name
+            and self._matcher == other._matcher
+        )
+
+    def __hash__(self) -> int:
+        return hash((_ExtractMatchingNode, self._name, self._matcher))
+
     def __repr__(self) -> str:
         return (
             f"SaveMatchedNode(matcher={repr(self._matcher)}, name={repr(self._name)})"
@@ -396,10 +803,23 @@ class MatchIfTrue(Generic[_CallableT]):
     you are passing to :func:`matches`.
     """
 
+    __slots__ = ("_func", "_negated", "_uninverted", "__weakref__")
+
+    _MATCH_KIND: int = _KIND_MATCH_IF_TRUE
+
+    # User-supplied callables may have side effects, so we never cache them.
+    _memoizable: bool = False
+
     def __init__(self, func: _CallableT) -> None:
-        # Without a cast, pyre thinks that self.func is not a function, even though
-        # it recognizes that it is a _CallableT bound to Callable.
-        self._func: Callable[[object], bool] = cast(Callable[[object], bool], func)
+        # pyre-ignore[8] Pyre thinks that func is not a function, even though it
+        # recognizes that it is a _CallableT bound to Callable.
+        self._func: Callable[[object], bool] = func
+        # Inverting flips this flag rather than wrapping _func in another lambda,
+        # so an inverted matcher costs the same to evaluate as the original.
+        self._negated: bool = False
+        # Set when this was produced by inverting another MatchIfTrue, so that
+        # inverting it again hands back the original instead of a new matcher.
+        self._uninverted: Optional["MatchIfTrue[_CallableT]"] = None
 
     @property
     def func(self) -> Callable[[object], bool]:
@@ -408,34 +828,48 @@ class MatchIfTrue(Generic[_CallableT]):
         if we match. If the function returns ``True`` then we consider ourselves
         to be a match.
         """
+        if self._negated:
+            func = self._func
+            return lambda val: not func(val)
         return self._func
 
     def __or__(
         self, other: _OtherNodeT
     ) -> "OneOf[Union[MatchIfTrue[_CallableT], _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below OneOf is type OneOf[object]
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
         # even though it has the types passed into it.
-        return cast(
-            OneOf[Union[MatchIfTrue[_CallableT], _OtherNodeT]], OneOf(self, other)
-        )
+        return OneOf(self, other)
 
     def __and__(
         self, other: _OtherNodeT
     ) -> "AllOf[Union[MatchIfTrue[_CallableT], _OtherNodeT]]":
-        # Without a cast, pyre thinks that the below AllOf is type AllOf[object]
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
         # even though it has the types passed into it.
-        return cast(
-            AllOf[Union[MatchIfTrue[_CallableT], _OtherNodeT]], AllOf(self, other)
-        )
+        return AllOf(self, other)
 
     def __invert__(self) -> "MatchIfTrue[_CallableT]":
-        # Construct a wrapped version of MatchIfTrue for typing simplicity.
-        # Without the cast, pyre doesn't seem to think the lambda is valid.
-        return MatchIfTrue(cast(_CallableT, lambda val: not self._func(val)))
+        if self._uninverted is not None:
+            return self._uninverted
+        # pyre-ignore[6] Pyre doesn't think that _func is a _CallableT.
+        inverse = MatchIfTrue(self._func)
+        inverse._negated = not self._negated
+        inverse._uninverted = self
+        return inverse
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, MatchIfTrue)
+            and _comparison_key(self._func) == _comparison_key(other._func)
+            and self._negated == other._negated
+        )
+
+    def __hash__(self) -> int:
+        return hash((MatchIfTrue, _comparison_key(self._func), self._negated))
 
     def __repr__(self) -> str:
         # pyre-ignore Pyre doesn't believe that functions have a repr.
-        return f"MatchIfTrue({repr(self._func)})"
+        func = f"MatchIfTrue({repr(self._func)})"
+        return f"DoesNotMatch({func})" if self._negated else func
 
 
 def MatchRegex(regex: Union[str, Pattern[str]]) -> MatchIfTrue[Callable[[str], bool]]:
@@ -453,14 +887,21 @@ def MatchRegex(regex: Union[str, Pattern[str]]) -> MatchIfTrue[Callable[[str], b
 
     This can be used in place of any string literal when constructing a concrete
     matcher.
+
+    Python's re module uses a backtracking engine, so some patterns can take
+    exponential time on unlucky input. If that is a concern, you can instead pass a
+    pattern compiled by a linear time engine such as
+    `google-re2 <https://pypi.org/project/google-re2/>`_. Any compiled pattern that
+    provides a ``fullmatch`` method returning ``None`` on failure will work.
     """
 
+    # Compile once up front so that each call doesn't need to go through the
+    # re module's pattern cache.
+    fullmatch = (re.compile(regex) if isinstance(regex, str) else regex).fullmatch
+
     def _match_func(value: object) -> bool:
-        if isinstance(value, str):
-            # pyre-ignore Pyre doesn't think a 'Pattern' can be passed to fullmatch.
-            return bool(re.fullmatch(regex, value))
-        else:
-            return False
+        # LibCST only ever stores plain strings, so an exact type check is enough.
+        return type(value) is str and fullmatch(value) is not None
 
     return MatchIfTrue(_match_func)
 
@@ -470,7 +911,7 @@ class _BaseMetadataMatcher:
     Class that's only around for typing purposes.
     """
 
-    pass
+    __slots__ = ()
 
 
 class MatchMetadata(_BaseMetadataMatcher):
@@ -511,6 +952,10 @@ class MatchMetadata(_BaseMetadataMatcher):
     are passing to :func:`matches`.
     """
 
+    __slots__ = ("_key", "_value", "__weakref__")
+
+    _MATCH_KIND: int = _KIND_METADATA
+
     def __init__(
         self,
         key: Type[meta.BaseMetadataProvider[_MetadataValueT]],
@@ -537,17 +982,29 @@ class MatchMetadata(_BaseMetadataMatcher):
         return self._value
 
     def __or__(self, other: _OtherNodeT) -> "OneOf[Union[MatchMetadata, _OtherNodeT]]":
-        # Without the cast, pyre doesn't know this is valid
-        return cast(OneOf[Union[MatchMetadata, _OtherNodeT]], OneOf(self, other))
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
+        # even though it has the types passed into it.
+        return OneOf(self, other)
 
     def __and__(self, other: _OtherNodeT) -> "AllOf[Union[MatchMetadata, _OtherNodeT]]":
-        # Without the cast, pyre doesn't know this is valid
-        return cast(AllOf[Union[MatchMetadata, _OtherNodeT]], AllOf(self, other))
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
+        # even though it has the types passed into it.
+        return AllOf(self, other)
 
     def __invert__(self) -> "MatchMetadata":
-        # We intentionally lie here, for the same reason given in the documentation
-        # for DoesNotMatch.
-        return cast(MatchMetadata, _InverseOf(self))
+        # pyre-ignore[7] We intentionally lie here, for the same reason given in
+        # the documentation for DoesNotMatch.
+        return _InverseOf(self)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, MatchMetadata)
+            and self._key == other._key
+            and _comparison_key(self._value) == _comparison_key(other._value)
+        )
+
+    def __hash__(self) -> int:
+        return hash((MatchMetadata, self._key, _comparison_key(self._value)))
 
     def __repr__(self) -> str:
         return f"MatchMetadata(key={repr(self._key)}, value={repr(self._value)})"
@@ -592,6 +1049,13 @@ class MatchMetadataIfTrue(_BaseMetadataMatcher):
     are passing to :func:`matches`.
     """
 
+    __slots__ = ("_key", "_func", "_negated", "_uninverted", "__weakref__")
+
+    _MATCH_KIND: int = _KIND_METADATA_IF_TRUE
+
+    # User-supplied callables may have side effects, so we never cache them.
+    _memoizable: bool = False
+
     def __init__(
         self,
         key: Type[meta.BaseMetadataProvider[_MetadataValueT]],
@@ -599,6 +1063,12 @@ class MatchMetadataIfTrue(_BaseMetadataMatcher):
     ) -> None:
         self._key: Type[meta.BaseMetadataProvider[_MetadataValueT]] = key
         self._func: Callable[[_MetadataValueT], bool] = func
+        # Inverting flips this flag rather than wrapping _func in another lambda,
+        # so an inverted matcher costs the same to evaluate as the original.
+        self._negated: bool = False
+        # Set when this was produced by inverting another MatchMetadataIfTrue, so
+        # that inverting it again hands back the original instead of a new matcher.
+        self._uninverted: Optional["MatchMetadataIfTrue"] = None
 
     @property
     def key(self) -> meta.ProviderT:
@@ -616,27 +1086,50 @@ class MatchMetadataIfTrue(_BaseMetadataMatcher):
         provided in ``key``. If the function returns ``True`` then we consider ourselves
         to be a match.
         """
+        if self._negated:
+            func = self._func
+            return lambda val: not func(val)
         return self._func
 
     def __or__(
         self, other: _OtherNodeT
     ) -> "OneOf[Union[MatchMetadataIfTrue, _OtherNodeT]]":
-        # Without the cast, pyre doesn't know this is valid
-        return cast(OneOf[Union[MatchMetadataIfTrue, _OtherNodeT]], OneOf(self, other))
+        # pyre-ignore[7] Pyre thinks that the below OneOf is type OneOf[object]
+        # even though it has the types passed into it.
+        return OneOf(self, other)
 
     def __and__(
         self, other: _OtherNodeT
     ) -> "AllOf[Union[MatchMetadataIfTrue, _OtherNodeT]]":
-        # Without the cast, pyre doesn't know this is valid
-        return cast(AllOf[Union[MatchMetadataIfTrue, _OtherNodeT]], AllOf(self, other))
+        # pyre-ignore[7] Pyre thinks that the below AllOf is type AllOf[object]
+        # even though it has the types passed into it.
+        return AllOf(self, other)
 
     def __invert__(self) -> "MatchMetadataIfTrue":
-        # Construct a wrapped version of MatchMetadataIfTrue for typing simplicity.
-        return MatchMetadataIfTrue(self._key, lambda val: not self._func(val))
+        if self._uninverted is not None:
+            return self._uninverted
+        inverse = MatchMetadataIfTrue(self._key, self._func)
+        inverse._negated = not self._negated
+        inverse._uninverted = self
+        return inverse
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, MatchMetadataIfTrue)
+            and self._key == other._key
+            and _comparison_key(self._func) == _comparison_key(other._func)
+            and self._negated == other._negated
+        )
+
+    def __hash__(self) -> int:
+        return hash(
+            (MatchMetadataIfTrue, self._key, _comparison_key(self._func), self._negated)
+        )
 
     def __repr__(self) -> str:
         # pyre-ignore Pyre doesn't believe that functions have a repr.
-        return f"MatchMetadataIfTrue(key={repr(self._key)}, func={repr(self._func)})"
+        func = f"MatchMetadataIfTrue(key={repr(self._key)}, func={repr(self._func)})"
+        return f"DoesNotMatch({func})" if self._negated else func
 
 
 class _BaseWildcardNode:
@@ -645,7 +1138,7 @@ class _BaseWildcardNode:
     specify that they take a wildcard node type.
     """
 
-    pass
+    __slots__ = ()
 
 
 class AtLeastN(Generic[_MatcherT], _BaseWildcardNode):
@@ -678,6 +1171,8 @@ class AtLeastN(Generic[_MatcherT], _BaseWildcardNode):
         m.Call(args=[m.AtLeastN(n=4), m.Arg(m.Integer())])
     """
 
+    __slots__ = ("_n", "_matcher", "_memoizable", "_branches", "__weakref__")
+
     def __init__(
         self,
         matcher: Union[_MatcherT, DoNotCareSentinel] = DoNotCareSentinel.DEFAULT,
@@ -688,6 +1183,9 @@ class AtLeastN(Generic[_MatcherT], _BaseWildcardNode):
             raise Exception(f"{self.__class__.__name__} n attribute must be positive")
         self._n: int = n
         self._matcher: Union[_MatcherT, DoNotCareSentinel] = matcher
+        memoizable, branches = _memoization_info((matcher,))
+        self._memoizable: bool = memoizable
+        self._branches: int = branches + 1
 
     @property
     def n(self) -> int:
@@ -715,6 +1213,16 @@ class AtLeastN(Generic[_MatcherT], _BaseWildcardNode):
     def __invert__(self) -> NoReturn:
         raise Exception("Cannot invert an AtLeastN matcher!")
 
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, AtLeastN)
+            and self._n == other._n
+            and self._matcher == other._matcher
+        )
+
+    def __hash__(self) -> int:
+        return hash((AtLeastN, self._n, self._matcher))
+
     def __repr__(self) -> str:
         if self._n == 0:
             return f"ZeroOrMore({repr(self._matcher)})"
@@ -746,7 +1254,7 @@ def ZeroOrMore(
 
         m.Call(args=[m.ZeroOrMore(), m.Arg(m.SimpleString()), m.ZeroOrMore()])
     """
-    return cast(AtLeastN[Union[_MatcherT, DoNotCareSentinel]], AtLeastN(matcher, n=0))
+    return AtLeastN(matcher, n=0)
 
 
 class AtMostN(Generic[_MatcherT], _BaseWildcardNode):
@@ -779,6 +1287,8 @@ class AtMostN(Generic[_MatcherT], _BaseWildcardNode):
         m.Call(args=[m.AtMostN(n=2), m.Arg(m.SimpleString())])
     """
 
+    __slots__ = ("_n", "_matcher", "_memoizable", "_branches", "__weakref__")
+
     def __init__(
         self,
         matcher: Union[_MatcherT, DoNotCareSentinel] = DoNotCareSentinel.DEFAULT,
@@ -789,6 +1299,9 @@ class AtMostN(Generic[_MatcherT], _BaseWildcardNode):
             raise Exception(f"{self.__class__.__name__} n attribute must be positive")
         self._n: int = n
         self._matcher: Union[_MatcherT, DoNotCareSentinel] = matcher
+        memoizable, branches = _memoization_info((matcher,))
+        self._memoizable: bool = memoizable
+        self._branches: int = branches + 1
 
     @property
     def n(self) -> int:
@@ -817,6 +1330,16 @@ class AtMostN(Generic[_MatcherT], _BaseWildcardNode):
     def __invert__(self) -> NoReturn:
         raise Exception("Cannot invert an AtMostN matcher!")
 
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, AtMostN)
+            and self._n == other._n
+            and self._matcher == other._matcher
+        )
+
+    def __hash__(self) -> int:
+        return hash((AtMostN, self._n, self._matcher))
+
     def __repr__(self) -> str:
         if self._n == 1:
             return f"ZeroOrOne({repr(self._matcher)})"
@@ -842,7 +1365,7 @@ def ZeroOrOne(
         m.Call(args=[m.Arg(m.SimpleString()), m.ZeroOrOne(), m.Arg(m.SimpleString())])
 
     """
-    return cast(AtMostN[Union[_MatcherT, DoNotCareSentinel]], AtMostN(matcher, n=1))
+    return AtMostN(matcher, n=1)
 
 
 def DoesNotMatch(obj: _OtherNodeT) -> _OtherNodeT:
@@ -901,7 +1424,8 @@ def DoesNotMatch(obj: _OtherNodeT) -> _OtherNodeT:
     else:
         # We must wrap in a _InverseOf.
         inverse = _InverseOf(obj)
-    return cast(_OtherNodeT, inverse)
+    # pyre-ignore[7] We intentionally lie about the type, see above.
+    return inverse
 
 
 def SaveMatchedNode(matcher: _OtherNodeT, name: str) -> _OtherNodeT:
@@ -930,7 +1454,89 @@ def SaveMatchedNode(matcher: _OtherNodeT, name: str) -> _OtherNodeT:
     root matcher. Calling :func:`extract` directly on a :func:`SaveMatchedNode` is
     redundant since you already have the reference to the node itself.
     """
-    return cast(_OtherNodeT, _ExtractMatchingNode(matcher, name))
+    # pyre-ignore[7] We intentionally lie about the type, the same as DoesNotMatch.
+    return _ExtractMatchingNode(matcher, name)
+
+
+class _MatchContext:
+    """
+    State shared by all of the recursive matching helpers for the duration of a
+    single top-level match. Alongside the metadata fetcher, this optionally holds
+    a cache of match results keyed on ``(id(matcher), id(node))``. Without it,
+    the same sub-problems get evaluated over and over again whenever a
+    :class:`OneOf` tries each of its options or a wildcard in a sequence
+    backtracks, which is exponential in the worst case. Both the matcher and
+    the tree are kept alive for the lifetime of the context, so the identities
+    used as keys are stable. When caching, the result of each
+    :class:`MatchIfTrue` callable is also remembered per value, so that a
+    callable shared between several options only runs once for any value.
+    """
+
+    __slots__ = ("metadata_lookup", "memo", "predicate_memo")
+
+    def __init__(
+        self,
+        metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+        *,
+        memoize: bool = False,
+    ) -> None:
+        self.metadata_lookup = metadata_lookup
+        self.memo: Optional[Dict[Tuple[int, int], bool]] = {} if memoize else None
+        self.predicate_memo: Optional[Dict[Tuple[int, int], bool]] = (
+            {} if memoize else None
+        )
+
+    def match_if_true(
+        self, matcher: "MatchIfTrue[Callable[[object], bool]]", value: object
+    ) -> bool:
+        predicate_memo = self.predicate_memo
+        if predicate_memo is None:
+            return bool(matcher._func(value)) is not matcher._negated
+        # Key on the callable rather than the matcher, so that a MatchIfTrue and
+        # its inverse share results.
+        key = (id(matcher._func), id(value))
+        result = predicate_memo.get(key)
+        if result is None:
+            result = predicate_memo[key] = bool(matcher._func(value))
+        return result is not matcher._negated
+
+
+# While matching, captures are kept as a list of (name, node) pairs in the order
+# that they were made, where a later capture by the same name overrides an earlier
+# one. Merging the captures of each level of the tree into its parent's is then
+# a matter of extending a list, rather than inserting each name into a dictionary
+# again, and we only build a dictionary once the match as a whole succeeds.
+_CapturesT = List[Tuple[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]
+
+# Returned by the matching helpers whenever something matches without capturing
+# anything, which is by far the most common case, so that they don't need to
+# allocate a new list for each match. It must never be mutated.
+_NO_CAPTURES: _CapturesT = []
+
+
+def _captures_to_dict(
+    captures: _CapturesT,
+) -> Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]:
+    return dict(captures)
+
+
+def _merge_captures(first: _CapturesT, second: _CapturesT) -> _CapturesT:
+    # Captures in the second list take priority. Every matching helper hands its
+    # caller a list that nothing else holds on to, so rather than building a new
+    # list for each merge, we extend one of them in place. Neither is ever
+    # _NO_CAPTURES by the time we get to extending it.
+    if not first:
+        return second
+    if second:
+        first.extend(second)
+    return first
+
+
+def _consumes_nothing(matcher: object) -> bool:
+    # Whether a matcher left over at the end of a sequence can match no nodes.
+    if isinstance(matcher, AtLeastN):
+        return matcher.n == 0
+    return isinstance(matcher, AtMostN)
 
 
 def _sequence_matches(  # noqa: C901
@@ -944,214 +1550,354 @@ def _sequence_matches(  # noqa: C901
             DoNotCareSentinel,
         ]
     ],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> Optional[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]:
-    if not nodes and not matchers:
-        # Base case, empty lists are alwatys matches
-        return {}
-    if not nodes and matchers:
-        # Base case, we have one or more matcher that wasn't matched
-        return (
-            {}
-            if all(
-                (isinstance(m, AtLeastN) and m.n == 0) or isinstance(m, AtMostN)
-                for m in matchers
+    context: _MatchContext,
+    node_index: int = 0,
+    matcher_index: int = 0,
+    head: Optional[object] = None,
+) -> Optional[_CapturesT]:
+    # Rather than slicing nodes and matchers for every step, we walk them by index.
+    # When set, head stands in for matchers[matcher_index]. It is the matcher
+    # wrapped by a SaveMatchedNode.
+    captures: _CapturesT = _NO_CAPTURES
+    while True:
+        if matcher_index == len(matchers):
+            # If we have nodes left, they don't match any matcher.
+            return captures if node_index == len(nodes) else None
+        matcher = matchers[matcher_index] if head is None else head
+
+        if node_index == len(nodes):
+            # We have one or more matchers that weren't matched, which is only
+            # fine if they are all wildcards that can match nothing.
+            if not _consumes_nothing(matcher):
+                return None
+            for index in range(matcher_index + 1, len(matchers)):
+                if not _consumes_nothing(matchers[index]):
+                    return None
+            return captures
+
+        node = nodes[node_index]
+        if matcher is _DONOTCARE:
+            # We don't care about the value for this node.
+            pass
+        elif isinstance(matcher, _BaseWildcardNode):
+            wildcard_capture = _wildcard_matches(
+                nodes, matchers, context, node_index, matcher_index, matcher
             )
-            else None
-        )
-    if nodes and not matchers:
-        # Base case, we have nodes left that don't match any matcher
-        return None
-
-    # Recursive case, nodes and matchers LHS matches
-    node = nodes[0]
-    matcher = matchers[0]
-    if isinstance(matcher, DoNotCareSentinel):
-        # We don't care about the value for this node.
-        return _sequence_matches(nodes[1:], matchers[1:], metadata_lookup)
-    elif isinstance(matcher, _BaseWildcardNode):
-        if isinstance(matcher, AtMostN):
-            if matcher.n > 0:
-                # First, assume that this does match a node (greedy).
-                # Consume one node since it matched this matcher.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    sequence_capture = _sequence_matches(
-                        nodes[1:],
-                        [AtMostN(matcher.matcher, n=matcher.n - 1), *matchers[1:]],
-                        metadata_lookup,
-                    )
-                    if sequence_capture is not None:
-                        return {**attribute_capture, **sequence_capture}
-            # Finally, assume that this does not match the current node.
-            # Consume the matcher but not the node.
-            sequence_capture = _sequence_matches(nodes, matchers[1:], metadata_lookup)
-            if sequence_capture is not None:
-                return sequence_capture
-        elif isinstance(matcher, AtLeastN):
-            if matcher.n > 0:
-                # Only match if we can consume one of the matches, since we still
-                # need to match N nodes.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    sequence_capture = _sequence_matches(
-                        nodes[1:],
-                        [AtLeastN(matcher.matcher, n=matcher.n - 1), *matchers[1:]],
-                        metadata_lookup,
-                    )
-                    if sequence_capture is not None:
-                        return {**attribute_capture, **sequence_capture}
-            else:
-                # First, assume that this does match a node (greedy).
-                # Consume one node since it matched this matcher.
-                attribute_capture = _attribute_matches(
-                    nodes[0], matcher.matcher, metadata_lookup
-                )
-                if attribute_capture is not None:
-                    sequence_capture = _sequence_matches(
-                        nodes[1:], matchers, metadata_lookup
-                    )
-                    if sequence_capture is not None:
-                        return {**attribute_capture, **sequence_capture}
-                # Now, assume that this does not match the current node.
-                # Consume the matcher but not the node.
-                sequence_capture = _sequence_matches(
-                    nodes, matchers[1:], metadata_lookup
-                )
-                if sequence_capture is not None:
-                    return sequence_capture
+            if wildcard_capture is None:
+                return None
+            return _merge_captures(captures, wildcard_capture)
+        elif isinstance(matcher, _ExtractMatchingNode):
+            # See if the raw matcher matches. If it does, capture the sequence we
+            # matched and store it.
+            sequence_capture = _sequence_matches(
+                nodes, matchers, context, node_index, matcher_index, matcher.matcher
+            )
+            if sequence_capture is None:
+                return None
+            # Our own match capture comes first, since we want to allow the
+            # same name later in the sequence to override us.
+            captures = _merge_captures(captures, [(matcher.name, nodes[node_index:])])
+            return _merge_captures(captures, sequence_capture)
         else:
-            # There are no other types of wildcard consumers, but we're making
-            # pyre happy with that fact.
-            raise Exception(f"Logic error unrecognized wildcard {type(matcher)}!")
-    elif isinstance(matcher, _ExtractMatchingNode):
-        # See if the raw matcher matches. If it does, capture the sequence we matched and store it.
+            match_capture = _matches(node, matcher, context)
+            if match_capture is None:
+                return None
+            # These values match directly, so there is nothing to backtrack to.
+            # Keep going without recursing, letting later captures take priority.
+            captures = _merge_captures(captures, match_capture)
+
+        node_index += 1
+        matcher_index += 1
+        head = None
+
+
+def _wildcard_matches(
+    nodes: Sequence[Union[MaybeSentinel, libcst.CSTNode]],
+    matchers: Sequence[
+        Union[
+            BaseMatcherNode,
+            _BaseWildcardNode,
+            MatchIfTrue[Callable[[object], bool]],
+            _BaseMetadataMatcher,
+            DoNotCareSentinel,
+        ]
+    ],
+    context: _MatchContext,
+    node_index: int,
+    matcher_index: int,
+    matcher: _BaseWildcardNode,
+) -> Optional[_CapturesT]:
+    # Matches the rest of the sequence, starting with a wildcard that may consume
+    # the node at node_index.
+    if isinstance(matcher, AtMostN):
+        minimum = 0
+        maximum = min(len(nodes), node_index + matcher.n)
+    elif isinstance(matcher, AtLeastN):
+        minimum = matcher.n
+        maximum = len(nodes)
+    else:
+        # There are no other types of wildcard consumers, but we're making
+        # pyre happy with that fact.
+        raise Exception(f"Logic error unrecognized wildcard {type(matcher)}!")
+
+    # The rest of the sequence needs some number of nodes left over for it, so
+    # only the positions in between are worth trying as the end of the wildcard.
+    rest_minimum, rest_maximum = _consumption_bounds(matchers, matcher_index + 1)
+    maximum = min(maximum, len(nodes) - rest_minimum)
+    if rest_maximum is not None:
+        minimum = max(minimum, len(nodes) - rest_maximum - node_index)
+
+    # First, consume as many nodes as the wildcard will take (greedy). We loop
+    # rather than recursing once per node, so that long sequences don't run into
+    # the recursion limit.
+    consumed: List[_CapturesT] = []
+    end = node_index
+    while end < maximum:
+        attribute_capture = _attribute_matches(nodes[end], matcher.matcher, context)
+        if attribute_capture is None:
+            break
+        consumed.append(attribute_capture)
+        end += 1
+
+    # Now, give nodes back one at a time until the rest of the sequence matches.
+    while end - node_index >= minimum:
         sequence_capture = _sequence_matches(
-            nodes, [matcher.matcher, *matchers[1:]], metadata_lookup
+            nodes, matchers, context, end, matcher_index + 1
         )
         if sequence_capture is not None:
-            return {
-                # Our own match capture comes first, since we wnat to allow the same
-                # name later in the sequence to override us.
-                matcher.name: nodes,
-                **sequence_capture,
-            }
-        return None
+            captures: _CapturesT = _NO_CAPTURES
+            for attribute_capture in consumed[: end - node_index]:
+                captures = _merge_captures(captures, attribute_capture)
+            return _merge_captures(captures, sequence_capture)
+        end -= 1
+    return None
 
-    match_capture = _matches(node, matcher, metadata_lookup)
-    if match_capture is not None:
-        # These values match directly
-        sequence_capture = _sequence_matches(nodes[1:], matchers[1:], metadata_lookup)
-        if sequence_capture is not None:
-            return {**match_capture, **sequence_capture}
 
-    # Failed recursive case, no match
-    return None
+def _bounded_sequence_matches(
+    nodes: Sequence[Union[MaybeSentinel, libcst.CSTNode]],
+    matchers: Sequence[
+        Union[
+            BaseMatcherNode,
+            _BaseWildcardNode,
+            MatchIfTrue[Callable[[object], bool]],
+            _BaseMetadataMatcher,
+            DoNotCareSentinel,
+        ]
+    ],
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
+    # Before doing any backtracking, make sure that the number of nodes is within
+    # the bounds of what the matchers can consume. This rules out most mismatches
+    # against wildcard heavy sequences in linear time.
+    minimum, maximum = _consumption_bounds(matchers, 0)
+    if len(nodes) < minimum or (maximum is not None and len(nodes) > maximum):
+        return None
+    return _sequence_matches(nodes, matchers, context)
+
+
+def _consumption_bounds(
+    matchers: Sequence[object], start: int
+) -> Tuple[int, Optional[int]]:
+    # Returns the fewest and the most nodes that matchers[start:] can consume,
+    # where None means there is no limit.
+    minimum = 0
+    maximum: Optional[int] = 0
+    for index in range(start, len(matchers)):
+        matcher = matchers[index]
+        while isinstance(matcher, _ExtractMatchingNode):
+            # Captures consume whatever their child matcher consumes.
+            matcher = matcher.matcher
+        if isinstance(matcher, AtLeastN):
+            minimum += matcher.n
+            maximum = None
+        elif isinstance(matcher, AtMostN):
+            if maximum is not None:
+                maximum += matcher.n
+        else:
+            # Everything else consumes exactly one node.
+            minimum += 1
+            if maximum is not None:
+                maximum += 1
+    return minimum, maximum
 
 
 _AttributeValueT = Optional[Union[MaybeSentinel, libcst.CSTNode, str, bool]]
 _AttributeMatcherT = Optional[Union[BaseMatcherNode, DoNotCareSentinel, str, bool]]
 
 
-def _attribute_matches(  # noqa: C901
+# Kinds for the builtin values that show up in matchers, looked up by exact type
+# before falling back to isinstance checks for any subclasses.
+_BUILTIN_KINDS: Dict[type, int] = {
+    type(None): _KIND_IDENTITY,
+    bool: _KIND_IDENTITY,
+    str: _KIND_EQUALITY,
+    list: _KIND_SEQUENCE,
+    tuple: _KIND_SEQUENCE,
+}
+
+
+def _intern_leaf(value: object) -> object:
+    # String comparisons start with an identity check, so interning the strings
+    # that we compare against lets them short-circuit against any interned value
+    # in the tree, such as the string literals that code building nodes uses.
+    return sys.intern(value) if type(value) is str else value
+
+
+def _match_kind(matcher: object) -> int:
+    if matcher is _DONOTCARE:
+        return _KIND_DONOTCARE
+    matcher_type = type(matcher)
+    kind = getattr(matcher_type, "_MATCH_KIND", None)
+    if kind is None:
+        kind = _BUILTIN_KINDS.get(matcher_type)
+    if kind is not None:
+        return kind
+    if matcher is None or isinstance(matcher, bool):
+        return _KIND_IDENTITY
+    if isinstance(matcher, str):
+        return _KIND_EQUALITY
+    if isinstance(matcher, collections.abc.Sequence):
+        return _KIND_SEQUENCE
+    return _KIND_NODE
+
+
+def _classify_field(value: object) -> Tuple[int, object]:
+    # Works out how to match an attribute of a concrete matcher, returning its
+    # kind along with the value that _classified_attribute_matches should use.
+    kind = _match_kind(value)
+    if kind == _KIND_INVERSE:
+        # Inverting a plain value is common, for example to match any keyword
+        # argument with DoesNotMatch(None). Flip the comparison instead of
+        # matching the value and then inverting the result.
+        inner = cast(_InverseOf[object], value).matcher
+        inner_kind = _match_kind(inner)
+        if inner_kind == _KIND_IDENTITY:
+            return _KIND_NOT_IDENTITY, inner
+        if inner_kind == _KIND_EQUALITY:
+            return _KIND_NOT_EQUALITY, _intern_leaf(inner)
+    elif kind == _KIND_EQUALITY:
+        return kind, _intern_leaf(value)
+    elif kind == _KIND_SEQUENCE and not any(
+        isinstance(element, (_BaseWildcardNode, _ExtractMatchingNode))
+        for element in cast(Sequence[object], value)
+    ):
+        # Most sequences in matchers are plain positional matches. Spotting them
+        # up front lets us skip the bounds checks and backtracking machinery.
+        return _KIND_FIXED_SEQUENCE, value
+    return kind, value
+
+
+def _attribute_matches(
     node: Union[_AttributeValueT, Sequence[_AttributeValueT]],
     matcher: Union[_AttributeMatcherT, Sequence[_AttributeMatcherT]],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> Optional[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]:
-    if isinstance(matcher, DoNotCareSentinel):
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
+    return _classified_attribute_matches(node, _match_kind(matcher), matcher, context)
+
+
+def _classified_attribute_matches(  # noqa: C901
+    node: Union[_AttributeValueT, Sequence[_AttributeValueT]],
+    kind: int,
+    matcher: Union[_AttributeMatcherT, Sequence[_AttributeMatcherT]],
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
+    if kind == _KIND_DONOTCARE:
         # We don't care what this is, so don't penalize a non-match.
-        return {}
-    if isinstance(matcher, _InverseOf):
+        return _NO_CAPTURES
+    if kind == _KIND_INVERSE:
         # Return the opposite evaluation
         return (
-            {}
-            if _attribute_matches(node, matcher.matcher, metadata_lookup) is None
+            _NO_CAPTURES
+            # pyre-ignore We know that matcher is an _InverseOf here.
+            if _attribute_matches(node, matcher.matcher, context) is None
             else None
         )
-    if isinstance(matcher, _ExtractMatchingNode):
-        attribute_capture = _attribute_matches(node, matcher.matcher, metadata_lookup)
+    if kind == _KIND_EXTRACT:
+        # pyre-ignore We know that matcher is an _ExtractMatchingNode here.
+        attribute_capture = _attribute_matches(node, matcher.matcher, context)
         if attribute_capture is not None:
-            return {
-                # Our own match capture comes last, since its higher in the tree
-                # so we want to override any child match captures by the same name.
-                **attribute_capture,
-                matcher.name: node,
-            }
-        return None
-
-    if isinstance(matcher, MatchIfTrue):
+            # Our own match capture comes last, since its higher in the tree
+            # so we want to override any child match captures by the same name.
+            # pyre-ignore We know that matcher is an _ExtractMatchingNode here.
+            name = matcher.name
+            attribute_capture = _merge_captures(attribute_capture, [(name, node)])
+        return attribute_capture
+
+    if kind == _KIND_MATCH_IF_TRUE:
         # We should only return if the matcher function is true.
-        return {} if matcher.func(node) else None
+        # pyre-ignore We know that matcher is a MatchIfTrue here.
+        return _NO_CAPTURES if context.match_if_true(matcher, node) else None
 
-    if matcher is None:
-        # Should exactly be None
-        return {} if node is None else None
+    if kind == _KIND_IDENTITY:
+        # Should exactly be None or match matcher bool
+        return _NO_CAPTURES if node is matcher else None
 
-    if isinstance(matcher, str):
-        # Should exactly match matcher text
-        return {} if node == matcher else None
+    if kind == _KIND_NOT_IDENTITY:
+        return _NO_CAPTURES if node is not matcher else None
 
-    if isinstance(matcher, bool):
-        # Should exactly match matcher bool
-        return {} if node is matcher else None
+    if kind == _KIND_NOT_EQUALITY:
+        return _NO_CAPTURES if node != matcher else None
+
+    if kind == _KIND_EQUALITY:
+        # Should exactly match matcher text
+        return _NO_CAPTURES if node == matcher else None
 
     if isinstance(node, collections.abc.Sequence):
         # Given we've generated the types for matchers based on LibCST, we know that
-        # this is true unless the node is badly constructed and types were ignored.
-        node = cast(
-            Sequence[Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode]], node
-        )
+        # node is a sequence of nodes unless the node is badly constructed and types
+        # were ignored.
 
-        if isinstance(matcher, OneOf):
+        if kind == _KIND_ONEOF:
             # We should compare against each of the sequences in the OneOf
-            for m in matcher.options:
+            # pyre-ignore We know that matcher is a OneOf here.
+            for m in matcher._match_options:
                 if isinstance(m, collections.abc.Sequence):
                     # Should match the sequence of requested nodes
-                    sequence_capture = _sequence_matches(node, m, metadata_lookup)
+                    sequence_capture = _bounded_sequence_matches(node, m, context)
                     if sequence_capture is not None:
                         return sequence_capture
                 elif isinstance(m, MatchIfTrue):
-                    return {} if matcher.func(node) else None
-        elif isinstance(matcher, AllOf):
+                    return _NO_CAPTURES if matcher.func(node) else None
+        elif kind == _KIND_ALLOF:
             # We should compare against each of the sequences in the AllOf
-            all_captures = {}
-            for m in matcher.options:
+            all_captures = _NO_CAPTURES
+            # pyre-ignore We know that matcher is an AllOf here.
+            for m in matcher._match_options:
                 if isinstance(m, collections.abc.Sequence):
                     # Should match the sequence of requested nodes
-                    sequence_capture = _sequence_matches(node, m, metadata_lookup)
+                    sequence_capture = _bounded_sequence_matches(node, m, context)
                     if sequence_capture is None:
                         return None
-                    all_captures = {**all_captures, **sequence_capture}
+                    all_captures = _merge_captures(all_captures, sequence_capture)
                 elif isinstance(m, MatchIfTrue):
-                    return {} if matcher.func(node) else None
+                    return _NO_CAPTURES if matcher.func(node) else None
                 else:
                     # The value in the AllOf wasn't a sequence, it can't match.
                     return None
             # We passed the checks above for each node, so we passed.
             return all_captures
-        elif isinstance(matcher, collections.abc.Sequence):
+        elif kind == _KIND_SEQUENCE:
             # We should assume that this matcher is a sequence to compare. Given
             # the way we generate match classes, this should be true unless the
             # match is badly constructed and types were ignored.
-            return _sequence_matches(
-                node,
-                cast(
-                    Sequence[
-                        Union[
-                            BaseMatcherNode,
-                            _BaseWildcardNode,
-                            MatchIfTrue[Callable[[object], bool]],
-                            DoNotCareSentinel,
-                        ]
-                    ],
-                    matcher,
-                ),
-                metadata_lookup,
-            )
+            # pyre-ignore[6] We know that matcher is a sequence of matchers here.
+            return _bounded_sequence_matches(node, matcher, context)
+        elif kind == _KIND_FIXED_SEQUENCE:
+            # Each matcher consumes exactly one node, so there's nothing to
+            # backtrack over and we can match the two sequences pairwise.
+            # pyre-ignore[6] We know that matcher is a sequence of matchers here.
+            if len(node) != len(matcher):
+                return None
+            all_captures = _NO_CAPTURES
+            # pyre-ignore[6] We know that matcher is a sequence of matchers here.
+            for element, element_matcher in zip(node, matcher):
+                if element_matcher is _DONOTCARE:
+                    continue
+                element_capture = _matches(element, element_matcher, context)
+                if element_capture is None:
+                    return None
+                all_captures = _merge_captures(all_captures, element_capture)
+            return all_captures
 
         # We exhausted our possibilities, there's no match
         return None
@@ -1160,11 +1906,8 @@ def _attribute_matches(  # noqa: C901
     # correct here because we generate matchers directly off of LibCST nodes,
     # so the only way it is wrong is if the node was badly constructed and
     # types were ignored.
-    return _matches(
-        cast(Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode], node),
-        cast(Union[BaseMatcherNode, MatchIfTrue, _BaseMetadataMatcher], matcher),
-        metadata_lookup,
-    )
+    # pyre-ignore[6] We've handled every other type of node and matcher above.
+    return _matches(node, matcher, context)
 
 
 def _metadata_matches(  # noqa: C901
@@ -1176,49 +1919,50 @@ def _metadata_matches(  # noqa: C901
         _InverseOf[_BaseMetadataMatcher],
         _ExtractMatchingNode[_BaseMetadataMatcher],
     ],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> Optional[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]:
-    if isinstance(metadata, OneOf):
-        for metadata in metadata.options:
-            metadata_capture = _metadata_matches(node, metadata, metadata_lookup)
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
+    kind = getattr(type(metadata), "_MATCH_KIND", None)
+    if kind == _KIND_ONEOF:
+        for metadata in metadata._match_options:
+            metadata_capture = _metadata_matches(node, metadata, context)
             if metadata_capture is not None:
                 return metadata_capture
         return None
-    elif isinstance(metadata, AllOf):
-        all_captures = {}
-        for metadata in metadata.options:
-            metadata_capture = _metadata_matches(node, metadata, metadata_lookup)
+    elif kind == _KIND_ALLOF:
+        all_captures = _NO_CAPTURES
+        for metadata in metadata._match_options:
+            metadata_capture = _metadata_matches(node, metadata, context)
             if metadata_capture is None:
                 return None
-            all_captures = {**all_captures, **metadata_capture}
+            all_captures = _merge_captures(all_captures, metadata_capture)
         # We passed the above checks, so we pass the matcher.
         return all_captures
-    elif isinstance(metadata, _InverseOf):
+    elif kind == _KIND_INVERSE:
         return (
-            {}
-            if _metadata_matches(node, metadata.matcher, metadata_lookup) is None
+            _NO_CAPTURES
+            if _metadata_matches(node, metadata.matcher, context) is None
             else None
         )
-    elif isinstance(metadata, _ExtractMatchingNode):
-        metadata_capture = _metadata_matches(node, metadata.matcher, metadata_lookup)
+    elif kind == _KIND_EXTRACT:
+        metadata_capture = _metadata_matches(node, metadata.matcher, context)
         if metadata_capture is not None:
-            return {
-                # Our own match capture comes last, since its higher in the tree
-                # so we want to override any child match captures by the same name.
-                **metadata_capture,
-                metadata.name: node,
-            }
-        return None
-    elif isinstance(metadata, MatchMetadataIfTrue):
-        actual_value = metadata_lookup(metadata.key, node)
+            # Our own match capture comes last, since its higher in the tree
+            # so we want to override any child match captures by the same name.
+            metadata_capture = _merge_captures(
+                metadata_capture, [(metadata.name, node)]
+            )
+        return metadata_capture
+    elif kind == _KIND_METADATA_IF_TRUE:
+        actual_value = context.metadata_lookup(metadata.key, node)
         if actual_value is _METADATA_MISSING_SENTINEL:
             return None
-        return {} if metadata.func(actual_value) else None
-    elif isinstance(metadata, MatchMetadata):
-        actual_value = metadata_lookup(metadata.key, node)
+        matched = bool(metadata._func(actual_value))
+        return _NO_CAPTURES if matched is not metadata._negated else None
+    elif kind == _KIND_METADATA:
+        actual_value = context.metadata_lookup(metadata.key, node)
         if actual_value is _METADATA_MISSING_SENTINEL:
             return None
-        return {} if actual_value == metadata.value else None
+        return _NO_CAPTURES if actual_value == metadata.value else None
     else:
         raise Exception("Logic error!")
 
@@ -1244,63 +1988,63 @@ def _node_matches(  # noqa: C901
             ]
         ],
     ],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> Optional[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]:
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
+    # Dispatch on the kind that each matcher class declares, so that the common
+    # case of a concrete matcher doesn't pay for a chain of isinstance checks.
+    kind = getattr(type(matcher), "_MATCH_KIND", _KIND_NODE)
     # If this is a _InverseOf, then invert the result.
-    if isinstance(matcher, _InverseOf):
+    if kind == _KIND_INVERSE:
         return (
-            {}
-            if _node_matches(node, matcher.matcher, metadata_lookup) is None
+            _NO_CAPTURES
+            if _node_matches(node, matcher.matcher, context) is None
             else None
         )
 
     # If this is an _ExtractMatchingNode, grab the resulting call and pass the check
     # forward.
-    if isinstance(matcher, _ExtractMatchingNode):
-        node_capture = _node_matches(node, matcher.matcher, metadata_lookup)
+    if kind == _KIND_EXTRACT:
+        node_capture = _node_matches(node, matcher.matcher, context)
         if node_capture is not None:
-            return {
-                # We come last here since we're further up the tree, so we want to
-                # override any identically named child match nodes.
-                **node_capture,
-                matcher.name: node,
-            }
-        return None
+            # We come last here since we're further up the tree, so we want to
+            # override any identically named child match nodes.
+            node_capture = _merge_captures(node_capture, [(matcher.name, node)])
+        return node_capture
 
     # Now, check if this is a lambda matcher.
-    if isinstance(matcher, MatchIfTrue):
-        return {} if matcher.func(node) else None
+    if kind == _KIND_MATCH_IF_TRUE:
+        return _NO_CAPTURES if context.match_if_true(matcher, node) else None
 
-    if isinstance(matcher, (MatchMetadata, MatchMetadataIfTrue)):
-        return _metadata_matches(node, matcher, metadata_lookup)
+    if kind == _KIND_METADATA or kind == _KIND_METADATA_IF_TRUE:
+        return _metadata_matches(node, matcher, context)
 
     # Now, check that the node and matcher classes are the same.
-    if node.__class__.__name__ != matcher.__class__.__name__:
+    node_type = getattr(matcher, "_node_type", None)
+    if node_type is not None:
+        if type(node) is not node_type:
+            return None
+    elif node.__class__.__name__ != matcher.__class__.__name__:
         return None
 
-    # Now, check that the children match for each attribute.
-    all_captures = {}
-    for field in fields(matcher):
-        if field.name == "_metadata":
-            # We don't care about this field, its a dataclasses implementation detail.
-            continue
-        elif field.name == "metadata":
-            # Special field we respect for matching metadata on a particular node.
-            desired = getattr(matcher, field.name)
-            if isinstance(desired, DoNotCareSentinel):
-                # We don't care about this
-                continue
-            metadata_capture = _metadata_matches(node, desired, metadata_lookup)
-            if metadata_capture is None:
-                return None
-            all_captures = {**all_captures, **metadata_capture}
-        else:
-            desired = getattr(matcher, field.name)
-            actual = getattr(node, field.name)
-            attribute_capture = _attribute_matches(actual, desired, metadata_lookup)
-            if attribute_capture is None:
-                return None
-            all_captures = {**all_captures, **attribute_capture}
+    # Now, check that the children match for each attribute that the matcher
+    # constrains. Attributes that we don't care about were dropped ahead of time.
+    all_captures = _NO_CAPTURES
+    for name, kind, desired in matcher._match_fields:
+        actual = getattr(node, name)
+        attribute_capture = _classified_attribute_matches(
+            actual, kind, desired, context
+        )
+        if attribute_capture is None:
+            return None
+        all_captures = _merge_captures(all_captures, attribute_capture)
+
+    # Special field we respect for matching metadata on a particular node.
+    desired = matcher._match_metadata
+    if desired is not _DONOTCARE:
+        metadata_capture = _metadata_matches(node, desired, context)
+        if metadata_capture is None:
+            return None
+        all_captures = _merge_captures(all_captures, metadata_capture)
 
     # We didn't find a non-match in the above loop, so it matches!
     return all_captures
@@ -1327,64 +2071,520 @@ def _matches(
             ]
         ],
     ],
-    metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
-) -> Optional[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]:
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
     if isinstance(node, MaybeSentinel):
         # We can't possibly match on a maybe sentinel, so it only matches if
         # the matcher we have is a _InverseOf.
-        return {} if isinstance(matcher, _InverseOf) else None
-
+        return _NO_CAPTURES if isinstance(matcher, _InverseOf) else None
+
+    memo = context.memo
+    if memo is not None and getattr(matcher, "_memoizable", False):
+        # Memoizable matchers never capture anything, so whether or not they
+        # matched is all that we need to remember.
+        key = (id(matcher), id(node))
+        matched = memo.get(key)
+        if matched is None:
+            matched = _matches_uncached(node, matcher, context) is not None
+            memo[key] = matched
+        return _NO_CAPTURES if matched else None
+    return _matches_uncached(node, matcher, context)
+
+
+def _matches_uncached(
+    node: libcst.CSTNode,
+    matcher: Union[
+        BaseMatcherNode,
+        MatchIfTrue[Callable[[object], bool]],
+        _BaseMetadataMatcher,
+        _InverseOf[
+            Union[
+                BaseMatcherNode,
+                MatchIfTrue[Callable[[object], bool]],
+                _BaseMetadataMatcher,
+            ]
+        ],
+        _ExtractMatchingNode[
+            Union[
+                BaseMatcherNode,
+                MatchIfTrue[Callable[[object], bool]],
+                _BaseMetadataMatcher,
+            ]
+        ],
+    ],
+    context: _MatchContext,
+) -> Optional[_CapturesT]:
     # Now, evaluate the matcher node itself.
-    if isinstance(matcher, OneOf):
-        for matcher in matcher.options:
-            node_capture = _node_matches(node, matcher, metadata_lookup)
+    kind = getattr(type(matcher), "_MATCH_KIND", _KIND_NODE)
+    if kind == _KIND_ONEOF:
+        for matcher in matcher._match_options:
+            node_capture = _node_matches(node, matcher, context)
             if node_capture is not None:
                 return node_capture
         return None
-    elif isinstance(matcher, AllOf):
-        all_captures = {}
-        for matcher in matcher.options:
-            node_capture = _node_matches(node, matcher, metadata_lookup)
+    elif kind == _KIND_ALLOF:
+        all_captures = _NO_CAPTURES
+        for matcher in matcher._match_options:
+            node_capture = _node_matches(node, matcher, context)
             if node_capture is None:
                 return None
-            all_captures = {**all_captures, **node_capture}
+            all_captures = _merge_captures(all_captures, node_capture)
         return all_captures
     else:
-        return _node_matches(node, matcher, metadata_lookup)
+        return _node_matches(node, matcher, context)
 
 
-def _construct_metadata_fetcher_null() -> Callable[
-    [meta.ProviderT, libcst.CSTNode], object
-]:
-    def _fetch(*args: object, **kwargs: object) -> object:
-        return _METADATA_MISSING_SENTINEL
+# A compiled matcher, see _compile_matches.
+_MatchPredicateT = Callable[[object], bool]
 
-    return _fetch
 
+def _is_concrete_matcher(matcher: object) -> bool:
+    return isinstance(matcher, BaseMatcherNode) and is_dataclass(matcher)
 
-def _construct_metadata_fetcher_dependent(
+
+def _compile_matches(matcher: object) -> Optional[_MatchPredicateT]:  # noqa: C901
+    """
+    Specializes a matcher into a plain predicate which returns the same thing as
+    ``_matches(node, matcher, context) is not None``, without walking through the
+    generic helpers above for every node. Only matchers that don't need captures,
+    metadata or backtracking through wildcards can be specialized. For anything
+    else, this returns ``None`` and the caller should fall back to _matches.
+    """
+    if isinstance(matcher, (OneOf, AllOf)):
+        body = _compile_options_matches(matcher)
+        if body is None:
+            return None
+    else:
+        compiled = _compile_node_matches(matcher)
+        if compiled is None:
+            return None
+        if _is_concrete_matcher(matcher):
+            # Comparing class names already rejects a MaybeSentinel.
+            return compiled
+        body = compiled
+
+    if isinstance(matcher, _InverseOf):
+        return lambda node: isinstance(node, MaybeSentinel) or body(node)
+    return lambda node: not isinstance(node, MaybeSentinel) and body(node)
+
+
+def _compile_node_matches(matcher: object) -> Optional[_MatchPredicateT]:  # noqa: C901
+    # Mirrors _node_matches for the matchers that we know how to specialize.
+    if isinstance(matcher, _InverseOf):
+        inner = matcher.matcher
+        if not (_is_concrete_matcher(inner) or isinstance(inner, MatchIfTrue)):
+            return None
+        compiled = _compile_node_matches(inner)
+        if compiled is None:
+            return None
+        return lambda node: not compiled(node)
+
+    if isinstance(matcher, MatchIfTrue):
+        func = matcher._func
+        negated = matcher._negated
+        return lambda node: bool(func(node)) is not negated
+
+    attributes = _compile_fields_matches(matcher)
+    if attributes is None:
+        return None
+    matcher = cast(BaseMatcherNode, matcher)
+    node_type = matcher._node_type
+    class_name = matcher.__class__.__name__
+
+    def predicate(node: object) -> bool:
+        if node_type is not None:
+            if type(node) is not node_type:
+                return False
+        elif node.__class__.__name__ != class_name:
+            return False
+        for name, check in attributes:
+            if not check(getattr(node, name)):
+                return False
+        return True
+
+    return predicate
+
+
+def _compile_fields_matches(
+    matcher: object,
+) -> Optional[Tuple[Tuple[str, _MatchPredicateT], ...]]:
+    # Compiles the check for each field of a concrete matcher, leaving out the
+    # check on the class of the node.
+    if not _is_concrete_matcher(matcher):
+        return None
+    matcher = cast(BaseMatcherNode, matcher)
+    if matcher._match_metadata is not _DONOTCARE:
+        return None
+
+    checks = []
+    for name, kind, desired in matcher._match_fields:
+        check = _compile_attribute_matches(kind, desired)
+        if check is None:
+            return None
+        checks.append((name, check))
+    return tuple(checks)
+
+
+def _compile_options_matches(  # noqa: C901
+    matcher: Union["OneOf[object]", "AllOf[object]"]
+) -> Optional[_MatchPredicateT]:
+    # Options that require different classes of node are usually mutually
+    # exclusive, so rather than trying each option on each node we work out
+    # which options are left to try for each class of node that we see. Those
+    # that require a node of that class only need their fields checked, and
+    # those that require some other class can't match at all. Other options are
+    # tried as usual. Options are still tried in the same order, so any
+    # MatchIfTrue callables are called just as they would be otherwise.
+    is_one_of = isinstance(matcher, OneOf)
+    options: List[
+        Tuple[Optional[type], _MatchPredicateT, Optional[_MatchPredicateT]]
+    ] = []
+    for option in matcher._match_options:
+        predicate = _compile_node_matches(option)
+        if predicate is None:
+            return None
+        option_type = getattr(option, "_node_type", None)
+        if option_type is None or not _is_concrete_matcher(option):
+            options.append((None, predicate, None))
+            continue
+        # We know this compiles, since the predicate did.
+        attributes = cast(
+            Tuple[Tuple[str, _MatchPredicateT], ...], _compile_fields_matches(option)
+        )
+        options.append((option_type, predicate, _fields_predicate(attributes)))
+
+    def factor(node_type: type) -> Tuple[Tuple[_MatchPredicateT, ...], bool]:
+        # Returns the predicates to try in order, and the result if none of them
+        # decide the match.
+        predicates = []
+        for option_type, predicate, fields_predicate in options:
+            if option_type is None:
+                predicates.append(predicate)
+            elif option_type is not node_type:
+                if not is_one_of:
+                    # This option fails, so AllOf fails once we get this far.
+                    return tuple(predicates), False
+            elif fields_predicate is not None:
+                predicates.append(fields_predicate)
+            elif is_one_of:
+                # This option matches, so OneOf matches once we get this far.
+                return tuple(predicates), True
+        return tuple(predicates), not is_one_of
+
+    factored: Dict[type, Tuple[Tuple[_MatchPredicateT, ...], bool]] = {}
+
+    if is_one_of:
+
+        def body(node: object) -> bool:
+            node_type = type(node)
+            try:
+                predicates, otherwise = factored[node_type]
+            except KeyError:
+                predicates, otherwise = factored[node_type] = factor(node_type)
+            for predicate in predicates:
+                if predicate(node):
+                    return True
+            return otherwise
+
+    else:
+
+        def body(node: object) -> bool:
+            node_type = type(node)
+            try:
+                predicates, otherwise = factored[node_type]
+            except KeyError:
+                predicates, otherwise = factored[node_type] = factor(node_type)
+            for predicate in predicates:
+                if not predicate(node):
+                    return False
+            return otherwise
+
+    return body
+
+
+def _fields_predicate(
+    attributes: Tuple[Tuple[str, _MatchPredicateT], ...]
+) -> Optional[_MatchPredicateT]:
+    # Returns a predicate for the fields of a node that's already known to be
+    # of the right class, or None if every node of that class matches.
+    if not attributes:
+        return None
+    if len(attributes) == 1:
+        ((name, check),) = attributes
+        return lambda node: check(getattr(node, name))
+
+    def predicate(node: object) -> bool:
+        for name, check in attributes:
+            if not check(getattr(node, name)):
+                return False
+        return True
+
+    return predicate
+
+
+def _compile_attribute_matches(  # noqa: C901
+    kind: int, matcher: object
+) -> Optional[_MatchPredicateT]:
+    # Mirrors _classified_attribute_matches for the matchers that we know how
+    # to specialize.
+    if kind == _KIND_IDENTITY:
+        return lambda value: value is matcher
+
+    if kind == _KIND_EQUALITY:
+        return lambda value: value == matcher
+
+    if kind == _KIND_NOT_IDENTITY:
+        return lambda value: value is not matcher
+
+    if kind == _KIND_NOT_EQUALITY:
+        return lambda value: value != matcher
+
+    if kind == _KIND_MATCH_IF_TRUE:
+        matcher = cast(MatchIfTrue[Callable[[object], bool]], matcher)
+        func = matcher._func
+        negated = matcher._negated
+        return lambda value: bool(func(value)) is not negated
+
+    if kind == _KIND_INVERSE:
+        inner = cast(_InverseOf[object], matcher).matcher
+        compiled = _compile_attribute_matches(_match_kind(inner), inner)
+        if compiled is None:
+            return None
+        return lambda value: not compiled(value)
+
+    if kind == _KIND_NODE:
+        return _compile_matches(matcher) if _is_concrete_matcher(matcher) else None
+
+    if kind == _KIND_ONEOF or kind == _KIND_ALLOF:
+        options = cast(Union[OneOf[object], AllOf[object]], matcher)._match_options
+        # Against a sequence, these only match through options that are
+        # themselves sequences or callables. Without any, a sequence never
+        # matches, so we only need to specialize matching against a node.
+        if not options or any(
+            isinstance(option, (collections.abc.Sequence, MatchIfTrue))
+            for option in options
+        ):
+            return None
+        compiled = _compile_matches(matcher)
+        if compiled is None:
+            return None
+        return lambda value: not isinstance(
+            value, collections.abc.Sequence
+        ) and compiled(value)
+
+    if kind == _KIND_SEQUENCE or kind == _KIND_FIXED_SEQUENCE:
+        if any(isinstance(element, _BaseWildcardNode) for element in matcher):
+            return _compile_wildcard_sequence_matches(cast(Sequence[object], matcher))
+        elements: List[Optional[_MatchPredicateT]] = []
+        for element in cast(Sequence[object], matcher):
+            if element is _DONOTCARE:
+                elements.append(None)
+                continue
+            # Captures need the backtracking in _sequence_matches.
+            compiled = _compile_matches(element)
+            if compiled is None:
+                return None
+            elements.append(compiled)
+        checks = tuple(elements)
+        length = len(checks)
+
+        def predicate(value: object) -> bool:
+            if not isinstance(value, collections.abc.Sequence) or len(value) != length:
+                return False
+            for check, element in zip(checks, value):
+                if check is not None and not check(element):
+                    return False
+            return True
+
+        return predicate
+
+    return None
+
+
+def _compile_wildcard_sequence_matches(  # noqa: C901
+    matchers: Sequence[object],
+) -> Optional[_MatchPredicateT]:
+    # Without captures, we only need to know whether there is some way of splitting
+    # the nodes between the matchers, rather than which one _sequence_matches would
+    # pick. So instead of backtracking, we track every position in the sequence
+    # that the matchers so far could have consumed up to, much like simulating an
+    # NFA. That takes linear time per matcher, whatever the wildcards. As this tries
+    # matchers against nodes in a different order, anything that calls into user
+    # code is left to _sequence_matches.
+    steps: List[Tuple[int, Optional[int], Optional[_MatchPredicateT]]] = []
+    for element in matchers:
+        if element is _DONOTCARE:
+            steps.append((1, 1, None))
+            continue
+        if not getattr(element, "_memoizable", True):
+            return None
+        if isinstance(element, (AtLeastN, AtMostN)):
+            inner = element.matcher
+            if inner is _DONOTCARE:
+                check = None
+            else:
+                check = _compile_attribute_matches(_match_kind(inner), inner)
+                if check is None:
+                    return None
+            if isinstance(element, AtLeastN):
+                steps.append((element.n, None, check))
+            else:
+                steps.append((0, element.n, check))
+            continue
+        check = _compile_matches(element)
+        if check is None:
+            return None
+        steps.append((1, 1, check))
+
+    def predicate(value: object) -> bool:
+        if not isinstance(value, collections.abc.Sequence):
+            return False
+        count = len(value)
+        # The positions that the matchers so far could have consumed up to, in
+        # ascending order.
+        reachable = [0]
+        for minimum, maximum, check in steps:
+            following = []
+            # Every node from a start position up to end passes the check, and
+            # failed is the first node past that which we know doesn't.
+            end = 0
+            failed = -1
+            for start in reachable:
+                if start > end:
+                    end = start
+                bound = count if maximum is None else min(count, start + maximum)
+                while end < bound:
+                    if end == failed or (check is not None and not check(value[end])):
+                        failed = end
+                        break
+                    end += 1
+                # Both the bound and the end of the run of passing nodes only grow
+                # with start, so the positions that we add stay in ascending order.
+                first = start + minimum
+                if following and following[-1] >= first:
+                    first = following[-1] + 1
+                following.extend(range(first, end + 1))
+            if not following:
+                return False
+            reachable = following
+        return reachable[-1] == count
+
+    return predicate
+
+
+def _compiled_matches(matcher: BaseMatcherNode) -> Optional[_MatchPredicateT]:
+    # Compiling is only worth it once, so the result is cached on the matcher.
+    try:
+        return matcher._compiled
+    except AttributeError:
+        pass
+    compiled = None
+    # Matchers with many branches benefit from the memoization that _matches
+    # does, which a specialized predicate doesn't have.
+    if getattr(matcher, "_branches", 0) <= _MEMOIZE_THRESHOLD:
+        compiled = _compile_matches(matcher)
+    object.__setattr__(matcher, "_compiled", compiled)
+    return compiled
+
+
+def _metadata_providers(matcher: object, providers: Set[meta.ProviderT]) -> None:
+    """
+    Adds every metadata provider that the matcher could look up to ``providers``.
+    """
+    if isinstance(matcher, (MatchMetadata, MatchMetadataIfTrue)):
+        providers.add(matcher.key)
+    elif isinstance(matcher, (OneOf, AllOf)):
+        for option in matcher.options:
+            _metadata_providers(option, providers)
+    elif isinstance(matcher, (_InverseOf, _ExtractMatchingNode, AtLeastN, AtMostN)):
+        _metadata_providers(matcher.matcher, providers)
+    elif _is_concrete_matcher(matcher):
+        concrete = cast(BaseMatcherNode, matcher)
+        for _, _, value in concrete._match_fields:
+            _metadata_providers(value, providers)
+        _metadata_providers(concrete._match_metadata, providers)
+    elif isinstance(matcher, collections.abc.Sequence) and not isinstance(matcher, str):
+        for element in matcher:
+            _metadata_providers(element, providers)
+
+
+def _fetch_metadata_null(*args: object, **kwargs: object) -> object:
+    return _METADATA_MISSING_SENTINEL
+
+
+def _construct_metadata_fetcher_null() -> Callable[
+    [meta.ProviderT, libcst.CSTNode], object
+]:
+    # This doesn't close over anything, so every caller can share the one.
+    return _fetch_metadata_null
+
+
+def _construct_metadata_fetcher_dependent(
     dependent_class: libcst.MetadataDependent,
 ) -> Callable[[meta.ProviderT, libcst.CSTNode], object]:
+    metadata: Dict[meta.ProviderT, Mapping[libcst.CSTNode, object]] = {}
+
     def _fetch(provider: meta.ProviderT, node: libcst.CSTNode) -> object:
-        return dependent_class.get_metadata(provider, node, _METADATA_MISSING_SENTINEL)
+        provider_metadata = metadata.get(provider)
+        if provider_metadata is None:
+            # The first lookup for each provider goes through get_metadata, so
+            # that a provider which isn't declared as a dependency fails as usual.
+            # After that, we can go straight to its metadata.
+            value = dependent_class.get_metadata(
+                provider, node, _METADATA_MISSING_SENTINEL
+            )
+            metadata[provider] = dependent_class.metadata[provider]
+            return value
+
+        return provider_metadata.get(node, _METADATA_MISSING_SENTINEL)
 
     return _fetch
 
 
 def _construct_metadata_fetcher_wrapper(
-    wrapper: libcst.MetadataWrapper,
+    wrapper: libcst.MetadataWrapper, providers: Collection[meta.ProviderT] = (),
 ) -> Callable[[meta.ProviderT, libcst.CSTNode], object]:
-    metadata: Dict[meta.ProviderT, Mapping[libcst.CSTNode, object]] = {}
+    # Resolve the providers that we know we'll need up front, all in one go, so
+    # that any dependencies they share are only computed once. Anything else is
+    # resolved the first time it's asked for.
+    metadata: Dict[meta.ProviderT, Mapping[libcst.CSTNode, object]] = (
+        dict(wrapper.resolve_many(providers)) if providers else {}
+    )
 
     def _fetch(provider: meta.ProviderT, node: libcst.CSTNode) -> object:
-        if provider not in metadata:
-            metadata[provider] = wrapper.resolve(provider)
+        provider_metadata = metadata.get(provider)
+        if provider_metadata is None:
+            provider_metadata = metadata[provider] = wrapper.resolve(provider)
 
-        return metadata.get(provider, {}).get(node, _METADATA_MISSING_SENTINEL)
+        return provider_metadata.get(node, _METADATA_MISSING_SENTINEL)
 
     return _fetch
 
 
+def _construct_metadata_fetcher_for_tree(
+    tree: Union[libcst.CSTNode, meta.MetadataWrapper],
+    matchers: Sequence[object],
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ],
+) -> Callable[[meta.ProviderT, libcst.CSTNode], object]:
+    # Used by the functions that look at the whole of a tree, rather than one node.
+    if isinstance(tree, meta.MetadataWrapper) and metadata_resolver is None:
+        # Provide a convenience for calling them directly on a MetadataWrapper.
+        metadata_resolver = tree
+
+    if metadata_resolver is None:
+        return _construct_metadata_fetcher_null()
+    elif isinstance(metadata_resolver, libcst.MetadataWrapper):
+        # We're about to look at the whole tree, so resolve its metadata up front.
+        providers: Set[meta.ProviderT] = set()
+        for matcher in matchers:
+            _metadata_providers(matcher, providers)
+        return _construct_metadata_fetcher_wrapper(metadata_resolver, providers)
+    else:
+        return _construct_metadata_fetcher_dependent(metadata_resolver)
+
+
 def extract(
     node: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode],
     matcher: BaseMatcherNode,
@@ -1413,6 +2613,19 @@ def extract(
     It cannot be a :class:`AtLeastN` or :class:`AtMostN` matcher because these types are
     wildcards which can only be used inside sequences.
     """
+    captures = _extract_captures(node, matcher, metadata_resolver)
+    return None if captures is None else _captures_to_dict(captures)
+
+
+def _extract_captures(
+    node: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode],
+    matcher: BaseMatcherNode,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ],
+) -> Optional[_CapturesT]:
+    # The work behind extract(), without turning the captures into a dictionary,
+    # which matches() has no use for.
     if isinstance(node, RemovalSentinel):
         # We can't possibly match on a removal sentinel, so it doesn't match.
         return None
@@ -1429,7 +2642,10 @@ def extract(
     else:
         fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
 
-    return _matches(node, matcher, fetcher)
+    context = _MatchContext(
+        fetcher, memoize=getattr(matcher, "_branches", 0) > _MEMOIZE_THRESHOLD
+    )
+    return _matches(node, matcher, context)
 
 
 def matches(
@@ -1453,10 +2669,30 @@ def matches(
     It cannot be a :class:`AtLeastN` or :class:`AtMostN` matcher because these types
     are wildcards which can only be used inside sequences.
     """
-    return extract(node, matcher, metadata_resolver=metadata_resolver) is not None
+    if isinstance(matcher, BaseMatcherNode):
+        compiled = _compiled_matches(matcher)
+        if compiled is not None:
+            return not isinstance(node, RemovalSentinel) and compiled(node)
+    return _extract_captures(node, matcher, metadata_resolver) is not None
 
 
-class _FindAllVisitor(libcst.CSTVisitor):
+class _FoundEnough(Exception):
+    """
+    Raised by :class:`_FindAllVisitor` to stop traversing a tree once it has found
+    as many matches as it was asked for.
+    """
+
+    pass
+
+
+class _FindAllVisitor:
+    """
+    Records the nodes that match a matcher, along with their captures. This is
+    driven by :func:`_visit_preorder` rather than being a
+    :class:`~libcst.CSTVisitor`, since we only need ``on_visit`` and never
+    rebuild the tree.
+    """
+
     def __init__(
         self,
         matcher: Union[
@@ -1472,20 +2708,387 @@ class _FindAllVisitor(libcst.CSTVisitor):
             ],
         ],
         metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+        limit: Optional[int] = None,
+        find: bool = True,
+        extract: bool = True,
     ) -> None:
         self.matcher = matcher
-        self.metadata_lookup = metadata_lookup
+        self.limit = limit
+        # Whether to record the matching nodes and their captures respectively.
+        self.find = find
+        self.extract = extract
+        # Like matches(), use a specialized predicate for matchers that have one.
+        # They never capture anything.
+        self.compiled: Optional[_MatchPredicateT] = (
+            _compiled_matches(matcher) if isinstance(matcher, BaseMatcherNode) else None
+        )
+        # The tree is not modified while we visit it, so match results can be
+        # cached for the whole traversal. Parents are visited before children, so
+        # this saves re-evaluating a matcher against a child that we've already
+        # evaluated it against while matching its parent.
+        self.context = _MatchContext(
+            metadata_lookup,
+            memoize=getattr(matcher, "_branches", 0) > _MEMOIZE_THRESHOLD,
+        )
+        # Most nodes in a tree can be ruled out by their type alone, without
+        # going through the matching machinery at all.
+        self.node_types: Optional[
+            FrozenSet[Type[libcst.CSTNode]]
+        ] = _candidate_node_types(matcher)
+        # Likewise, whole subtrees can be skipped when nothing in them can match.
+        self.node_type_index: Optional[_NodeTypeIndex] = (
+            None if self.node_types is None else _node_type_index()
+        )
+        # Both of those only depend on the class of the node, so for each class
+        # that we come across we keep whether to visit its children, and whether
+        # to try matching it.
+        self.dispatch: Dict[type, Tuple[bool, bool]] = {}
         self.found_nodes: List[libcst.CSTNode] = []
-        self.extracted_nodes: List[
-            Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]
-        ] = []
+        self.extracted_nodes: List[_CapturesT] = []
+        # Bound once up front for each match that we record, or None when we
+        # aren't recording that output at all.
+        self.append_found: Optional[Callable[[libcst.CSTNode], None]] = (
+            self.found_nodes.append if self.find else None
+        )
+        self.append_extracted: Optional[Callable[[_CapturesT], None]] = (
+            self.extracted_nodes.append if self.extract else None
+        )
+
+    def _dispatch(self, node_type: type) -> Tuple[bool, bool]:
+        node_types = self.node_types
+        if node_types is None:
+            return True, True
+        recurse = cast(_NodeTypeIndex, self.node_type_index).may_contain(
+            node_type, node_types
+        )
+        return recurse, node_type in node_types
 
     def on_visit(self, node: libcst.CSTNode) -> bool:
-        match = _matches(node, self.matcher, self.metadata_lookup)
+        node_type = type(node)
+        try:
+            recurse, candidate = self.dispatch[node_type]
+        except KeyError:
+            recurse, candidate = self.dispatch[node_type] = self._dispatch(node_type)
+        if not candidate:
+            return recurse
+        compiled = self.compiled
+        if compiled is not None:
+            match = _NO_CAPTURES if compiled(node) else None
+        else:
+            match = _matches(node, self.matcher, self.context)
         if match is not None:
-            self.found_nodes.append(node)
-            self.extracted_nodes.append(match)
+            append_extracted = self.append_extracted
+            if append_extracted is not None:
+                append_extracted(match)
+            append_found = self.append_found
+            if append_found is not None:
+                append_found(node)
+                if self.limit is not None and len(self.found_nodes) >= self.limit:
+                    raise _FoundEnough()
+        return recurse
+
+
+def _candidate_node_types(
+    matcher: object,
+) -> Optional[FrozenSet[Type[libcst.CSTNode]]]:
+    """
+    Returns the LibCST node classes that a top-level matcher could possibly
+    match, or ``None`` if it could match any node.
+    """
+    if isinstance(matcher, OneOf):
+        node_types: Set[Type[libcst.CSTNode]] = set()
+        for option in matcher.options:
+            option_types = _candidate_node_types(option)
+            if option_types is None:
+                return None
+            node_types.update(option_types)
+        return frozenset(node_types)
+    if isinstance(matcher, AllOf):
+        candidates = None
+        for option in matcher.options:
+            option_types = _candidate_node_types(option)
+            if option_types is not None:
+                candidates = (
+                    option_types if candidates is None else candidates & option_types
+                )
+        return candidates
+    if isinstance(matcher, _ExtractMatchingNode):
+        return _candidate_node_types(matcher.matcher)
+    if _is_concrete_matcher(matcher):
+        # Concrete matchers only match nodes of their own class.
+        node_type = cast(BaseMatcherNode, matcher)._node_type
+        return None if node_type is None else frozenset((node_type,))
+    return None
+
+
+def _hint_node_types(hint: object, node_types: Set[type]) -> bool:
+    # Adds the node classes that a type annotation allows for to node_types.
+    # Returns False if we can't tell what the annotation allows for.
+    if hint in (None, type(None), Ellipsis) or isinstance(hint, (str, int, Enum)):
+        # Including the values in a Literal annotation.
         return True
+    if isinstance(hint, type):
+        if issubclass(hint, libcst.CSTNode):
+            node_types.add(hint)
+        return hint is not object
+    args = getattr(hint, "__args__", None)
+    if not args:
+        return False
+    return all(_hint_node_types(arg, node_types) for arg in args)
+
+
+class _NodeTypeIndex:
+    """
+    Works out which classes of node can appear anywhere beneath a node of a given
+    class, using the type annotations on the fields of the node classes. This
+    lets a traversal that is looking for certain classes of node skip over any
+    part of the tree which can't contain them, such as the whitespace and
+    parentheses around every expression.
+    """
+
+    def __init__(self, node_types: FrozenSet[Type[libcst.CSTNode]]) -> None:
+        # Every node class that exists, including subclasses defined outside of
+        # LibCST, which may show up wherever one of their bases is allowed.
+        self.node_types = node_types
+        self._subclasses: Dict[type, FrozenSet[type]] = {}
+        self._children: Dict[type, Optional[FrozenSet[type]]] = {}
+        self._descendants: Dict[type, Optional[FrozenSet[type]]] = {}
+
+    def _child_types(self, node_type: type) -> Optional[FrozenSet[type]]:
+        # Returns the classes of node that can be direct children of a node of
+        # the given class, or None if that can't be worked out.
+        try:
+            return self._children[node_type]
+        except KeyError:
+            pass
+        children: Optional[FrozenSet[type]] = None
+        hint_types: Set[type] = set()
+        try:
+            hints = get_type_hints(node_type)
+            known = is_dataclass(node_type) and all(
+                _hint_node_types(hints.get(field.name), hint_types)
+                for field in fields(node_type)
+            )
+        except Exception:
+            # Annotations that don't resolve tell us nothing.
+            known = False
+        if known:
+            child_types: Set[type] = set()
+            for hint_type in hint_types:
+                subclasses = self._subclasses.get(hint_type)
+                if subclasses is None:
+                    subclasses = self._subclasses[hint_type] = frozenset(
+                        t for t in self.node_types if issubclass(t, hint_type)
+                    )
+                child_types.update(subclasses)
+            children = frozenset(child_types)
+        self._children[node_type] = children
+        return children
+
+    def descendant_types(self, node_type: type) -> Optional[FrozenSet[type]]:
+        """
+        Returns the classes of node that can appear anywhere beneath a node of the
+        given class, or ``None`` if any class of node could.
+        """
+        try:
+            return self._descendants[node_type]
+        except KeyError:
+            pass
+        descendants: Optional[Set[type]] = set()
+        pending = [node_type]
+        while pending:
+            children = self._child_types(pending.pop())
+            if children is None:
+                descendants = None
+                break
+            for child in children:
+                if child not in descendants:
+                    descendants.add(child)
+                    pending.append(child)
+        result = None if descendants is None else frozenset(descendants)
+        self._descendants[node_type] = result
+        return result
+
+    def may_contain(
+        self, node_type: type, node_types: FrozenSet[Type[libcst.CSTNode]]
+    ) -> bool:
+        """
+        Returns whether a node of the given class could have a node of any of
+        the classes in ``node_types`` somewhere beneath it.
+        """
+        descendants = self.descendant_types(node_type)
+        return descendants is None or not descendants.isdisjoint(node_types)
+
+
+# The index is only valid for the node classes that existed when it was built,
+# so we rebuild it if any more get defined.
+_node_type_indexes: Dict[FrozenSet[type], _NodeTypeIndex] = {}
+
+
+def _node_type_index() -> _NodeTypeIndex:
+    node_types: Set[type] = set()
+    pending: List[type] = [libcst.CSTNode]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass not in node_types:
+                node_types.add(subclass)
+                pending.append(subclass)
+    key = frozenset(node_types)
+    index = _node_type_indexes.get(key)
+    if index is None:
+        _node_type_indexes.clear()
+        index = _node_type_indexes[key] = _NodeTypeIndex(key)
+    return index
+
+
+class _ChildFieldRecorder(libcst.CSTVisitor):
+    def __init__(self, node: libcst.CSTNode) -> None:
+        self.node = node
+        self.fields: List[str] = []
+
+    def on_visit(self, node: libcst.CSTNode) -> bool:
+        return False
+
+    def on_visit_attribute(self, node: libcst.CSTNode, attribute: str) -> None:
+        if node is self.node:
+            self.fields.append(attribute)
+
+    def on_leave(self, original_node: libcst.CSTNode) -> None:
+        pass
+
+    def on_leave_attribute(self, original_node: libcst.CSTNode, attribute: str) -> None:
+        pass
+
+
+# For each class of node, the names of the fields that hold its children in the
+# order that they're visited in, along with the names of any fields that we don't
+# know about, or None for classes that we can't work this out for.
+_child_fields_by_type: Dict[
+    type, Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+] = {}
+
+
+def _child_fields(
+    node: libcst.CSTNode,
+) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    node_type = type(node)
+    try:
+        return _child_fields_by_type[node_type]
+    except KeyError:
+        pass
+    child_fields: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+    if node_type.__module__.startswith("libcst._nodes."):
+        # Our own nodes visit their fields in a fixed order, so we can find out
+        # what it is from the first node of each class that we come across. The
+        # only exception is that a field may be skipped when it's None, in which
+        # case we don't know where it goes until we see a node where it's set.
+        recorder = _ChildFieldRecorder(node)
+        node._visit_and_replace_children(recorder)
+        visited = tuple(recorder.fields)
+        unknown = tuple(
+            field.name
+            for field in fields(node)
+            if field.name not in visited and getattr(node, field.name) is None
+        )
+        child_fields = (visited, unknown)
+    _child_fields_by_type[node_type] = child_fields
+    return child_fields
+
+
+def _visit_preorder(
+    tree: libcst.CSTNode, on_visit: Callable[[libcst.CSTNode], bool]
+) -> None:
+    """
+    Calls ``on_visit`` on every node in ``tree`` in the same order as
+    :meth:`~libcst.CSTNode.visit` would, skipping the children of any node that it
+    returns ``False`` for. This is only suitable for read-only traversals, but it
+    doesn't need to rebuild each node on the way back up.
+    """
+    stack: List[libcst.CSTNode] = [tree]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        if not on_visit(node):
+            continue
+        child_fields = _child_fields(node)
+        if child_fields is None or (
+            child_fields[1]
+            and any(getattr(node, field) is not None for field in child_fields[1])
+        ):
+            stack.extend(reversed(node.children))
+            continue
+        # Push children in reverse so that they come back off the stack in order.
+        for field in reversed(child_fields[0]):
+            value = getattr(node, field)
+            if isinstance(value, libcst.CSTNode):
+                push(value)
+            elif isinstance(value, (tuple, list)):
+                stack.extend(reversed(value))
+
+
+class _FindAllMultiVisitor:
+    """
+    Like :class:`_FindAllVisitor`, but for several matchers at once.
+    """
+
+    def __init__(
+        self,
+        matchers: Sequence[
+            Union[
+                BaseMatcherNode,
+                MatchIfTrue[Callable[[object], bool]],
+                _BaseMetadataMatcher,
+            ]
+        ],
+        metadata_lookup: Callable[[meta.ProviderT, libcst.CSTNode], object],
+    ) -> None:
+        self.matchers = matchers
+        # The tree is not modified while we visit it, so match results can be
+        # cached for the whole traversal. This also shares the work between any
+        # matchers that have sub-matchers in common.
+        self.context = _MatchContext(metadata_lookup, memoize=True)
+        self.found_nodes: List[List[libcst.CSTNode]] = [[] for _ in matchers]
+        # Bucket the matchers by the class of node that they can match, so that
+        # each node is only checked against matchers which could match it.
+        self.by_node_type: Dict[Type[libcst.CSTNode], List[int]] = {}
+        self.unbucketed: List[int] = []
+        for index, matcher in enumerate(matchers):
+            if isinstance(matcher, (AtLeastN, AtMostN)):
+                # These matchers are forbidden at top level and never match.
+                continue
+            node_types = _candidate_node_types(matcher)
+            if node_types is None:
+                self.unbucketed.append(index)
+            else:
+                for node_type in node_types:
+                    self.by_node_type.setdefault(node_type, []).append(index)
+        if self.unbucketed:
+            # Keep the matchers for each class in their original order.
+            for node_type, indices in self.by_node_type.items():
+                self.by_node_type[node_type] = sorted([*indices, *self.unbucketed])
+        # When every matcher only matches certain classes of node, whole subtrees
+        # can be skipped when nothing in them can match.
+        self.recurse_into: Dict[type, bool] = {}
+        self.node_type_index: Optional[_NodeTypeIndex] = (
+            None if self.unbucketed else _node_type_index()
+        )
+        self.node_types: FrozenSet[Type[libcst.CSTNode]] = frozenset(self.by_node_type)
+
+    def on_visit(self, node: libcst.CSTNode) -> bool:
+        indices = self.by_node_type.get(type(node), self.unbucketed)
+        for index in indices:
+            if _matches(node, self.matchers[index], self.context) is not None:
+                self.found_nodes[index].append(node)
+        node_type_index = self.node_type_index
+        if node_type_index is None:
+            return True
+        recurse = self.recurse_into.get(type(node))
+        if recurse is None:
+            recurse = self.recurse_into[type(node)] = node_type_index.may_contain(
+                type(node), self.node_types
+            )
+        return recurse
 
 
 def _find_or_extract_all(
@@ -1512,11 +3115,11 @@ def _find_or_extract_all(
     metadata_resolver: Optional[
         Union[libcst.MetadataDependent, libcst.MetadataWrapper]
     ] = None,
-) -> Tuple[
-    Sequence[libcst.CSTNode],
-    Sequence[Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]],
-]:
-    if isinstance(tree, (RemovalSentinel, MaybeSentinel)):
+    limit: Optional[int] = None,
+    find: bool = True,
+    extract: bool = True,
+) -> Tuple[Sequence[libcst.CSTNode], Sequence[_CapturesT]]:
+    if type(tree) in _TREE_SENTINEL_TYPES:
         # We can't possibly match on a removal sentinel, so it doesn't match.
         return [], []
     if isinstance(matcher, (AtLeastN, AtMostN)):
@@ -1524,20 +3127,30 @@ def _find_or_extract_all(
         # These are not subclasses of BaseMatcherNode, but in the case that the
         # user is not using type checking, this should still behave correctly.
         return [], []
-
-    if isinstance(tree, meta.MetadataWrapper) and metadata_resolver is None:
-        # Provide a convenience for calling findall directly on a MetadataWrapper.
-        metadata_resolver = tree
-
-    if metadata_resolver is None:
-        fetcher = _construct_metadata_fetcher_null()
-    elif isinstance(metadata_resolver, libcst.MetadataWrapper):
-        fetcher = _construct_metadata_fetcher_wrapper(metadata_resolver)
-    else:
-        fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
-
-    finder = _FindAllVisitor(matcher, fetcher)
-    tree.visit(finder)
+    node_types = _candidate_node_types(matcher)
+    if node_types is not None:
+        root_type = type(
+            tree.module if isinstance(tree, meta.MetadataWrapper) else tree
+        )
+        if root_type not in node_types and not _node_type_index().may_contain(
+            root_type, node_types
+        ):
+            # Nothing in this tree can be of a class that the matcher could match,
+            # which includes matchers that can't match anything at all, such as an
+            # AllOf over two different classes of node. So don't bother resolving
+            # metadata or traversing the tree.
+            return [], []
+
+    fetcher = _construct_metadata_fetcher_for_tree(tree, [matcher], metadata_resolver)
+    finder = _FindAllVisitor(matcher, fetcher, limit, find, extract)
+    try:
+        _visit_preorder(
+            tree.module if isinstance(tree, meta.MetadataWrapper) else tree,
+            finder.on_visit,
+        )
+    except _FoundEnough:
+        # We have all the matches that we need, so skip the rest of the tree.
+        pass
     return finder.found_nodes, finder.extracted_nodes
 
 
@@ -1572,7 +3185,9 @@ def findall(
     :class:`AtMostN` matcher because these types are wildcards which can only be usedi
     inside sequences.
     """
-    nodes, _ = _find_or_extract_all(tree, matcher, metadata_resolver=metadata_resolver)
+    nodes, _ = _find_or_extract_all(
+        tree, matcher, metadata_resolver=metadata_resolver, extract=False
+    )
     return nodes
 
 
@@ -1610,9 +3225,105 @@ def extractall(
     inside sequences.
     """
     _, extractions = _find_or_extract_all(
+        tree, matcher, metadata_resolver=metadata_resolver, find=False
+    )
+    return [_captures_to_dict(captures) for captures in extractions]
+
+
+def find_and_extract_all(
+    tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
+    matcher: Union[
+        BaseMatcherNode, MatchIfTrue[Callable[[object], bool]], _BaseMetadataMatcher
+    ],
+    *,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ] = None,
+) -> Sequence[
+    Tuple[libcst.CSTNode, Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]]
+]:
+    """
+    Given an arbitrary node from a LibCST tree and an arbitrary matcher, returns
+    a sequence of pairs of each node that :func:`findall` would have returned,
+    along with the dictionary that :func:`extractall` would have returned for it.
+    This saves traversing the tree twice when you need both the matching nodes and
+    what was saved from them.
+
+    The tree, matcher and ``metadata_resolver`` can be anything that is accepted
+    by :func:`findall`.
+    """
+    nodes, extractions = _find_or_extract_all(
         tree, matcher, metadata_resolver=metadata_resolver
     )
-    return extractions
+    return [
+        (node, _captures_to_dict(captures))
+        for node, captures in zip(nodes, extractions)
+    ]
+
+
+def findfirst(
+    tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
+    matcher: Union[
+        BaseMatcherNode, MatchIfTrue[Callable[[object], bool]], _BaseMetadataMatcher
+    ],
+    *,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ] = None,
+) -> Optional[libcst.CSTNode]:
+    """
+    Given an arbitrary node from a LibCST tree and an arbitrary matcher, returns the
+    first node that :func:`findall` would have returned, or ``None`` if nothing in
+    the tree matches. Unlike :func:`findall`, this stops traversing the tree as soon
+    as it finds a match, which makes it the cheaper choice when you only need to
+    know whether a tree contains a match.
+
+    The tree, matcher and ``metadata_resolver`` can be anything that is accepted
+    by :func:`findall`.
+    """
+    nodes, _ = _find_or_extract_all(
+        tree, matcher, metadata_resolver=metadata_resolver, limit=1, extract=False
+    )
+    return nodes[0] if nodes else None
+
+
+def findall_multi(
+    tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
+    matchers: Sequence[
+        Union[
+            BaseMatcherNode, MatchIfTrue[Callable[[object], bool]], _BaseMetadataMatcher
+        ]
+    ],
+    *,
+    metadata_resolver: Optional[
+        Union[libcst.MetadataDependent, libcst.MetadataWrapper]
+    ] = None,
+) -> Sequence[Sequence[libcst.CSTNode]]:
+    """
+    Given an arbitrary node from a LibCST tree and a sequence of arbitrary matchers,
+    iterates over that node and all children once, returning a sequence of all child
+    nodes that match for each of the given matchers. The result has one entry for
+    each matcher, in the same order as ``matchers``, and each entry is what
+    :func:`findall` would have returned for that matcher. This is more efficient
+    than calling :func:`findall` once per matcher, since the tree is only
+    traversed once, each node is only checked against matchers that could possibly
+    match its type, and sub-matchers that are shared between several matchers are
+    only evaluated once per node.
+
+    The tree, matchers and ``metadata_resolver`` can be anything that is accepted
+    by :func:`findall`.
+    """
+    if type(tree) in _TREE_SENTINEL_TYPES:
+        # We can't possibly match on a removal sentinel, so it doesn't match.
+        return [[] for _ in matchers]
+
+    fetcher = _construct_metadata_fetcher_for_tree(tree, matchers, metadata_resolver)
+    finder = _FindAllMultiVisitor(matchers, fetcher)
+    _visit_preorder(
+        tree.module if isinstance(tree, meta.MetadataWrapper) else tree,
+        finder.on_visit,
+    )
+    return finder.found_nodes
 
 
 class _ReplaceTransformer(libcst.CSTTransformer):
@@ -1645,7 +3356,7 @@ class _ReplaceTransformer(libcst.CSTTransformer):
         ],
     ) -> None:
         self.matcher = matcher
-        self.metadata_lookup = metadata_lookup
+        self.context = _MatchContext(metadata_lookup)
         self.replacement: Callable[
             [
                 libcst.CSTNode,
@@ -1677,14 +3388,33 @@ class _ReplaceTransformer(libcst.CSTTransformer):
         # we act as if there was not a match (because in reality, there would not
         # have been if we had run the matcher on the update).
         self.node_lut: Dict[libcst.CSTNode, libcst.CSTNode] = {}
+        # Like _FindAllVisitor, we skip any subtree that can't contain a match.
+        # Nothing in a skipped subtree is updated, so nodes that aren't in the
+        # lookup table translate to themselves, unless they were replaced.
+        self.replaced_nodes: Set[libcst.CSTNode] = set()
+        self.node_types: Optional[
+            FrozenSet[Type[libcst.CSTNode]]
+        ] = _candidate_node_types(matcher)
+        self.recurse_into: Dict[type, bool] = {}
+        self.node_type_index: Optional[_NodeTypeIndex] = (
+            None if self.node_types is None else _node_type_index()
+        )
+
+    def _original_translate(self, node: libcst.CSTNode) -> libcst.CSTNode:
+        updated = self.node_lut.get(node)
+        if updated is not None:
+            return updated
+        if node in self.replaced_nodes:
+            raise KeyError(node)
+        return node
 
     def _node_translate(
         self, node_or_sequence: Union[libcst.CSTNode, Sequence[libcst.CSTNode]]
     ) -> Union[libcst.CSTNode, Sequence[libcst.CSTNode]]:
         if isinstance(node_or_sequence, Sequence):
-            return tuple(self.node_lut[node] for node in node_or_sequence)
+            return tuple(self._original_translate(node) for node in node_or_sequence)
         else:
-            return self.node_lut[node_or_sequence]
+            return self._original_translate(node_or_sequence)
 
     def _extraction_translate(
         self, extracted: Dict[str, Union[libcst.CSTNode, Sequence[libcst.CSTNode]]]
@@ -1697,15 +3427,20 @@ class _ReplaceTransformer(libcst.CSTTransformer):
         # Track original to updated node mapping for this node.
         self.node_lut[original_node] = updated_node
 
+        node_types = self.node_types
+        if node_types is not None and type(original_node) not in node_types:
+            return updated_node
+
         # This gets complicated. We need to do the match on the original node,
         # but we want to do the extraction on the updated node. This is so
         # metadata works properly in matchers. So, if we get a match, we fix
         # up the nodes in the match and return that to the replacement lambda.
-        extracted = _matches(original_node, self.matcher, self.metadata_lookup)
-        if extracted is not None:
+        captures = _matches(original_node, self.matcher, self.context)
+        extracted = None
+        if captures is not None:
             try:
                 # Attempt to do a translation from original to updated node.
-                extracted = self._extraction_translate(extracted)
+                extracted = self._extraction_translate(_captures_to_dict(captures))
             except KeyError:
                 # One of the nodes we looked up doesn't exist anymore, this
                 # is no longer a match. This can happen if a child node was
@@ -1716,9 +3451,31 @@ class _ReplaceTransformer(libcst.CSTTransformer):
             # updated node. We don't want this to be part of a parent match
             # since we can't guarantee that the update matches anymore.
             del self.node_lut[original_node]
+            self.replaced_nodes.add(original_node)
             return self.replacement(updated_node, extracted)
         return updated_node
 
+    def on_visit(self, node: libcst.CSTNode) -> bool:
+        node_types = self.node_types
+        if node_types is None:
+            return True
+        node_type = type(node)
+        recurse = self.recurse_into.get(node_type)
+        if recurse is None:
+            recurse = self.recurse_into[node_type] = cast(
+                _NodeTypeIndex, self.node_type_index
+            ).may_contain(node_type, node_types)
+        return recurse
+
+    # The attribute callbacks run for every attribute in the tree, and by default
+    # look for a method named after each one, which we never have.
+
+    def on_visit_attribute(self, node: libcst.CSTNode, attribute: str) -> None:
+        pass
+
+    def on_leave_attribute(self, original_node: libcst.CSTNode, attribute: str) -> None:
+        pass
+
 
 def replace(
     tree: Union[MaybeSentinel, RemovalSentinel, libcst.CSTNode, meta.MetadataWrapper],
@@ -1774,7 +3531,7 @@ def replace(
     :class:`AtMostN` matcher because these types are wildcards which can only be usedi
     inside sequences.
     """
-    if isinstance(tree, (RemovalSentinel, MaybeSentinel)):
+    if type(tree) in _TREE_SENTINEL_TYPES:
         # We can't do any replacements on this, so return the tree exactly.
         return copy.deepcopy(tree)
     if isinstance(matcher, (AtLeastN, AtMostN)):
@@ -1788,16 +3545,6 @@ def replace(
         else:
             raise Exception("Logic error!")
 
-    if isinstance(tree, meta.MetadataWrapper) and metadata_resolver is None:
-        # Provide a convenience for calling replace directly on a MetadataWrapper.
-        metadata_resolver = tree
-
-    if metadata_resolver is None:
-        fetcher = _construct_metadata_fetcher_null()
-    elif isinstance(metadata_resolver, libcst.MetadataWrapper):
-        fetcher = _construct_metadata_fetcher_wrapper(metadata_resolver)
-    else:
-        fetcher = _construct_metadata_fetcher_dependent(metadata_resolver)
-
+    fetcher = _construct_metadata_fetcher_for_tree(tree, [matcher], metadata_resolver)
     replacer = _ReplaceTransformer(matcher, fetcher, replacement)
     return tree.visit(replacer)
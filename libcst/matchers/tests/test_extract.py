@@ -405,3 +405,15 @@ class MatchersExtractTest(UnitTest):
             ),
         )
         self.assertIsNone(nodes)
+
+    def test_extract_results_are_independent(self) -> None:
+        expression = cst.parse_expression("a + b")
+        # Matches that capture nothing are shared internally, so make sure that
+        # callers each get a dictionary that they are free to modify.
+        first = m.extract(expression, m.BinaryOperation())
+        self.assertEqual(first, {})
+        first["left"] = expression
+        self.assertEqual(m.extract(expression, m.BinaryOperation()), {})
+        for extraction in m.extractall(expression, m.Name()):
+            extraction["name"] = expression
+        self.assertEqual(m.extractall(expression, m.Name()), [{}, {}])
@@ -11,7 +11,14 @@ from typing import Optional, Sequence
 import libcst as cst
 import libcst.matchers as m
 import libcst.metadata as meta
-from libcst.matchers import extractall, findall
+from libcst.matchers import (
+    extractall,
+    find_and_extract_all,
+    findall,
+    findall_multi,
+    findfirst,
+)
+from libcst.matchers._matcher_base import _metadata_providers
 from libcst.testing.utils import UnitTest
 
 
@@ -97,6 +104,192 @@ class MatchersFindAllTest(UnitTest):
         )
         self.assertNodeSequenceEqual(booleans, [])
 
+    def test_findall_multi(self) -> None:
+        code = """
+            a = 1
+            b = True
+
+            def foo(bar: int) -> bool:
+                return False
+        """
+
+        module = cst.parse_module(dedent(code))
+        matchers = (
+            m.Name("True") | m.Name("False"),
+            m.Integer(),
+            m.MatchIfTrue(lambda node: isinstance(node, cst.Integer)),
+            m.Name("True") & m.Name(),
+            m.Name("a") | m.Integer(),
+            m.ZeroOrMore(),
+        )
+        found = findall_multi(module, matchers)
+        self.assertEqual(len(found), len(matchers))
+        for matcher, nodes in zip(matchers, found):
+            self.assertNodeSequenceEqual(nodes, findall(module, matcher))
+        self.assertNodeSequenceEqual(found[4], [cst.Name("a"), cst.Integer("1")])
+
+        # Metadata and sentinels work the same way as they do for findall.
+        wrapper = meta.MetadataWrapper(module)
+        found = findall_multi(
+            wrapper,
+            [
+                m.MatchMetadata(
+                    meta.ExpressionContextProvider, meta.ExpressionContext.STORE
+                ),
+                m.Name("bar"),
+            ],
+        )
+        self.assertNodeSequenceEqual(found[0], [cst.Name("a"), cst.Name("b")])
+        self.assertNodeSequenceEqual(found[1], [cst.Name("bar")])
+        self.assertEqual(
+            findall_multi(cst.RemovalSentinel.REMOVE, [m.Name(), m.Integer()]),
+            [[], []],
+        )
+
+    def test_findall_memoizes_across_nodes(self) -> None:
+        module = cst.parse_module("foo(1)\nbar(x)\n")
+        seen = []
+
+        def record(node: cst.CSTNode) -> bool:
+            seen.append(node)
+            return True
+
+        func = m.MatchIfTrue(record)
+        matcher = m.OneOf(
+            m.Call(func=func, args=[m.Arg(m.Integer())]),
+            m.Call(func=func | m.Attribute(attr=m.Name("bar")), args=[m.Arg()]),
+        )
+        self.assertNodeSequenceEqual(
+            findall(module, matcher),
+            [cst.parse_expression("foo(1)"), cst.parse_expression("bar(x)")],
+        )
+        # Each function name is only checked once, even though both options of
+        # the OneOf check it when matching bar(x).
+        self.assertNodeSequenceEqual(seen, [cst.Name("foo"), cst.Name("bar")])
+
+    def test_findall_skips_other_node_types(self) -> None:
+        module = cst.parse_module(
+            "a = foo(1)  # one\n"
+            "b: int = a.bar(True)\n"
+            "@baz(lambda x: (x, f'{x!r}'))\n"
+            "def qux(c, *, d=[e for e in f]):\n"
+            "    '''docstring'''\n"
+            "    return (yield c) or (\n"
+            "        # two\n"
+            "        d\n"
+            "    )\n"
+        )
+        every_node = findall(module, m.MatchIfTrue(lambda node: True))
+        matchers = (
+            m.Call(),
+            m.Name("a") | m.Integer(),
+            m.Name() & m.Name("foo"),
+            m.Name() & m.Integer(),
+            m.Name() & m.MatchIfTrue(lambda node: node.value != "a"),
+            m.SaveMatchedNode(m.Attribute(), "attr"),
+            ~m.Name(),
+            m.Name() | m.MatchIfTrue(lambda node: isinstance(node, cst.Integer)),
+            # Nodes that only show up deep inside of expressions or whitespace.
+            m.Comment(),
+            m.Lambda() | m.FunctionDef(),
+            m.Param(),
+            m.FormattedStringExpression(),
+            m.ParenthesizedWhitespace(),
+            m.CompFor(),
+            m.Yield(),
+        )
+        for matcher in matchers:
+            with self.subTest(matcher=matcher):
+                self.assertNodeSequenceEqual(
+                    findall(module, matcher),
+                    [node for node in every_node if m.matches(node, matcher)],
+                )
+        for found, matcher in zip(findall_multi(module, matchers[8:]), matchers[8:]):
+            with self.subTest(matcher=matcher):
+                self.assertNodeSequenceEqual(found, findall(module, matcher))
+
+    def test_findall_cannot_match(self) -> None:
+        class ResolvingFails(meta.BatchableMetadataProvider[bool]):
+            def visit_Module(self, node: cst.Module) -> None:
+                raise Exception("Metadata should not have been resolved!")
+
+        seen = []
+
+        def record(node: cst.CSTNode) -> bool:
+            seen.append(node)
+            return True
+
+        module = cst.parse_module("def foo(a: int = 1) -> None:\n    pass\n")
+        param = findall(module, m.Param())[0]
+        for tree, matcher in (
+            # No node can be both a Name and an Integer.
+            (
+                meta.MetadataWrapper(module),
+                m.Name(metadata=m.MatchMetadata(ResolvingFails, True)) & m.Integer(),
+            ),
+            (module, m.Name() & m.Integer(m.MatchIfTrue(record))),
+            # Nothing in a parameter can be a class definition.
+            (param, m.ClassDef(name=m.MatchIfTrue(record))),
+        ):
+            with self.subTest(matcher=matcher):
+                self.assertEqual(findall(tree, matcher), [])
+        self.assertEqual(seen, [])
+
+    def test_findall_visit_order(self) -> None:
+        # Matches come back in the same order that visiting the tree sees them,
+        # including from fields that are only visited when they are set.
+        module = cst.parse_module(
+            dedent(
+                """
+                def foo(a: int = 1, *b, c, **d) -> bar:
+                      return f"{a!r:{b}>{c}}" + f"{d}" + f"{a:{b}}"
+                if a:\r
+                    pass
+                """
+            )
+        )
+
+        class NameCollector(cst.CSTVisitor):
+            def __init__(self) -> None:
+                self.names = []
+
+            def visit_Name(self, node: cst.Name) -> None:
+                self.names.append(node)
+
+        collector = NameCollector()
+        module.visit(collector)
+        found = findall(module, m.Name())
+        self.assertEqual(len(found), len(collector.names))
+        for found_node, visited_node in zip(found, collector.names):
+            self.assertIs(found_node, visited_node)
+
+    def test_findfirst(self) -> None:
+        module = cst.parse_module("a = foo(1)\nb = bar(2)\n")
+        seen = []
+
+        def record(node: cst.CSTNode) -> bool:
+            seen.append(node)
+            return True
+
+        # We get the first match in the same order as findall, and stop there.
+        call = findfirst(module, m.Call(func=m.MatchIfTrue(record)))
+        self.assertIs(call, findall(module, m.Call())[0])
+        self.assertEqual(len(seen), 1)
+        self.assertIsNone(findfirst(module, m.Name("baz")))
+        self.assertIsNone(findfirst(cst.RemovalSentinel.REMOVE, m.Name()))
+
+        # Metadata works the same way as it does for findall.
+        wrapper = meta.MetadataWrapper(module)
+        name = findfirst(
+            wrapper,
+            m.Name(
+                metadata=m.MatchMetadata(
+                    meta.ExpressionContextProvider, meta.ExpressionContext.LOAD
+                )
+            ),
+        )
+        self.assertNodeSequenceEqual([name], [cst.Name("foo")])
+
     def test_findall_with_visitors(self) -> None:
         # Find all assignments in a tree
         class TestVisitor(m.MatcherDecoratableVisitor):
@@ -163,6 +356,45 @@ class MatchersFindAllTest(UnitTest):
         wrapper.visit(visitor)
         self.assertNodeSequenceEqual(visitor.results, [cst.Name("a"), cst.Name("b")])
 
+    def test_findall_with_nested_metadata(self) -> None:
+        # Metadata for every provider that the matcher looks at is resolved before
+        # the tree is traversed, including providers that are only used deep
+        # inside the matcher.
+        module = cst.parse_module("a = b\nc.d = e\nf, g = h\n")
+        wrapper = meta.MetadataWrapper(module)
+        stored_name = m.Name(
+            metadata=m.MatchMetadata(
+                meta.ExpressionContextProvider, meta.ExpressionContext.STORE
+            )
+        )
+        matcher = m.Assign(
+            targets=[
+                m.AssignTarget(
+                    stored_name
+                    | m.Tuple(
+                        elements=[
+                            m.ZeroOrMore(),
+                            m.Element(
+                                ~m.MatchMetadataIfTrue(
+                                    meta.PositionProvider,
+                                    lambda position: position.start.column == 0,
+                                )
+                            ),
+                        ]
+                    )
+                )
+            ]
+        )
+        providers = set()
+        _metadata_providers(matcher, providers)
+        self.assertEqual(
+            providers, {meta.ExpressionContextProvider, meta.PositionProvider}
+        )
+        self.assertNodeSequenceEqual(
+            findall(wrapper, matcher),
+            [wrapper.module.body[0].body[0], wrapper.module.body[2].body[0]],
+        )
+
 
 class MatchersExtractAllTest(UnitTest):
     def test_extractall_simple(self) -> None:
@@ -175,3 +407,21 @@ class MatchersExtractAllTest(UnitTest):
             matches,
             [{"expr": extracted_args[1].value}, {"expr": extracted_args[2].value}],
         )
+
+    def test_find_and_extract_all(self) -> None:
+        expression = cst.parse_expression("a + b[c], d(e, f * g, h.i.j)")
+        matcher = m.Arg(m.SaveMatchedNode(~m.Name(), "expr"))
+        extracted_args = cst.ensure_type(
+            cst.ensure_type(expression, cst.Tuple).elements[1].value, cst.Call
+        ).args
+        self.assertEqual(
+            find_and_extract_all(expression, matcher),
+            [
+                (extracted_args[1], {"expr": extracted_args[1].value}),
+                (extracted_args[2], {"expr": extracted_args[2].value}),
+            ],
+        )
+        self.assertEqual(
+            find_and_extract_all(expression, matcher),
+            list(zip(findall(expression, matcher), extractall(expression, matcher))),
+        )
@@ -4,8 +4,14 @@
 # LICENSE file in the root directory of this source tree.
 
 # pyre-strict
+import copy
+import re
+import weakref
+from typing import Optional
+
 import libcst as cst
 import libcst.matchers as m
+import libcst.metadata as meta
 from libcst.matchers import matches
 from libcst.testing.utils import UnitTest
 
@@ -1101,6 +1107,20 @@ class MatchersMatcherTest(UnitTest):
         # Fail to match due to incorrect value on Name.
         self.assertFalse(matches(cst.Name("foo"), m.Name(value=m.MatchRegex(r".*a.*"))))
 
+    def test_regex_matcher_compiled_pattern(self) -> None:
+        # Match using a pattern compiled by a different regex engine.
+        class Pattern:
+            def fullmatch(self, value: str) -> Optional[str]:
+                return value if value == "foo" else None
+
+        # pyre-ignore We intentionally pass an object that isn't a re.Pattern.
+        matcher = m.MatchRegex(Pattern())
+        self.assertTrue(matches(cst.Name("foo"), m.Name(value=matcher)))
+        self.assertFalse(matches(cst.Name("bar"), m.Name(value=matcher)))
+        self.assertTrue(
+            matches(cst.Name("foo"), m.Name(value=m.MatchRegex(re.compile(r"f.*"))))
+        )
+
     def test_and_matcher_true(self) -> None:
         # Match on True identifier in roundabout way.
         self.assertTrue(
@@ -1370,8 +1390,422 @@ class MatchersMatcherTest(UnitTest):
             matches(cst.Name("True"), m.Name(value=~(m.MatchRegex(r"True"))))
         )
 
+    def test_does_not_match_plain_values(self) -> None:
+        keyword_arg = cst.Arg(cst.Integer("1"), keyword=cst.Name("foo"))
+        positional_arg = cst.Arg(cst.Integer("1"))
+        for matcher, expected in (
+            (m.Arg(keyword=m.DoesNotMatch(None)), (True, False)),
+            (m.Arg(keyword=~m.Name("foo")), (False, True)),
+            (m.Arg(m.Integer(m.DoesNotMatch("1"))), (False, False)),
+            (m.Arg(m.Integer(m.DoesNotMatch("2"))), (True, True)),
+            (m.Arg(m.Integer(m.DoesNotMatch("2")), keyword=None), (False, True)),
+        ):
+            with self.subTest(matcher=matcher):
+                self.assertEqual(
+                    (matches(keyword_arg, matcher), matches(positional_arg, matcher)),
+                    expected,
+                )
+                self.assertEqual(
+                    (
+                        m.extract(keyword_arg, matcher) is not None,
+                        m.extract(positional_arg, matcher) is not None,
+                    ),
+                    expected,
+                )
+
     def test_inverse_inverse_is_identity(self) -> None:
         # Verify that we don't wrap an InverseOf in an InverseOf in normal circumstances.
         identity = m.Name("True")
         self.assertTrue(m.DoesNotMatch(m.DoesNotMatch(identity)) is identity)
         self.assertTrue((~(~identity)) is identity)
+
+        # Verify that inverting special matchers twice hands back the original
+        # instead of building up a new matcher tree.
+        identities = (
+            m.Name("True") | m.Name("False"),
+            m.Name() & m.Name("True"),
+            m.MatchIfTrue(lambda val: True),
+            m.MatchRegex(r"True"),
+            m.MatchMetadata(meta.PositionProvider, None),
+            m.MatchMetadataIfTrue(meta.PositionProvider, lambda val: True),
+        )
+        for identity in identities:
+            self.assertTrue(m.DoesNotMatch(m.DoesNotMatch(identity)) is identity)
+            self.assertTrue((~(~identity)) is identity)
+
+    def test_inverted_callable_matchers_share_func(self) -> None:
+        def is_true(value: object) -> bool:
+            return value == "True"
+
+        inverse = ~m.MatchIfTrue(is_true)
+        self.assertTrue(inverse._func is is_true)
+        self.assertFalse(inverse.func("True"))
+        self.assertTrue(inverse.func("False"))
+        self.assertTrue(matches(cst.Name("False"), m.Name(inverse)))
+        self.assertFalse(matches(cst.Name("True"), m.Name(inverse)))
+
+        inverse = ~m.MatchMetadataIfTrue(meta.PositionProvider, is_true)
+        self.assertTrue(inverse._func is is_true)
+        self.assertFalse(inverse.func("True"))
+        self.assertTrue(inverse.func("False"))
+
+    def test_memoized_matcher(self) -> None:
+        # Reuse the same sub-matchers in several places of a branching matcher so
+        # that results get cached and looked up again during a single match.
+        integer = m.Arg(m.Integer() | m.Name("x"))
+        call = cst.Call(
+            func=cst.Name("foo"),
+            args=(
+                cst.Arg(cst.Integer("1")),
+                cst.Arg(cst.Name("x")),
+                cst.Arg(cst.Integer("2")),
+                cst.Arg(cst.Name("y")),
+            ),
+        )
+        self.assertTrue(
+            matches(
+                call,
+                m.Call(
+                    args=[m.ZeroOrMore(integer), m.Arg(m.Name("y")), m.ZeroOrMore()]
+                ),
+            )
+        )
+        self.assertTrue(
+            matches(
+                call,
+                m.Call(
+                    args=[integer, m.ZeroOrMore(integer), m.ZeroOrOne(m.Arg(m.Name()))]
+                ),
+            )
+        )
+        self.assertFalse(
+            matches(
+                call, m.Call(args=[m.ZeroOrMore(integer), m.AtLeastN(integer, n=1)])
+            )
+        )
+
+    def test_memoized_match_if_true(self) -> None:
+        calls = []
+
+        def is_foo(value: str) -> bool:
+            calls.append(value)
+            return value == "foo"
+
+        foo = m.MatchIfTrue(is_foo)
+        matcher = m.OneOf(
+            m.Call(func=m.Name(foo), args=[m.Arg(m.Integer("2"))]),
+            m.Call(func=m.Name(foo) | m.Attribute(), args=[m.Arg(m.Integer("1"))]),
+            m.Call(func=m.Name(~foo)),
+        )
+        call = cst.Call(func=cst.Name("foo"), args=(cst.Arg(cst.Integer("1")),))
+        self.assertTrue(matches(call, matcher))
+        self.assertEqual(calls, ["foo"])
+        # Results are only remembered for the duration of a single match.
+        self.assertFalse(matches(cst.Call(func=cst.Name("foo"), args=()), matcher))
+        self.assertEqual(calls, ["foo", "foo"])
+
+    def test_matches_agrees_with_extract(self) -> None:
+        # matches() specializes simple matchers into a predicate, which must
+        # give the same answer as the general matching code used by extract().
+        module = cst.parse_module(
+            "def foo(self, a=None, *args):\n"
+            "    return isinstance(self.bar, baz) or foo(1, b=2)\n"
+        )
+        nodes = []
+
+        class CollectNodes(cst.CSTVisitor):
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                nodes.append(node)
+                return True
+
+        module.visit(CollectNodes())
+        matchers = (
+            m.Name("self"),
+            m.Name("a") | m.Name("self"),
+            m.Name() & m.Name(value=m.MatchRegex(r"[a-z]+")),
+            m.Attribute(value=m.Name("self"), attr=~m.Name("baz")),
+            m.Call(args=[m.DoNotCare(), m.Arg(keyword=None)]),
+            m.Call(func=m.Name("foo") | m.Attribute(), args=[m.Arg(m.Integer())]),
+            m.Param(default=None, star=""),
+            m.Param(default=~m.Name("None")),
+            m.Parameters(params=[m.Param(m.Name("self")), m.ZeroOrMore()]),
+            m.Parameters(params=[m.ZeroOrMore(), m.Param(m.Name("a")), m.ZeroOrMore()]),
+            m.Parameters(params=[m.AtLeastN(n=2), m.Param(m.Name("self"))]),
+            m.Parameters(
+                params=[m.AtMostN(m.Param(default=None), n=1), m.ZeroOrMore()]
+            ),
+            m.Call(args=[m.AtLeastN(m.Arg(keyword=None), n=1), m.Arg(m.Integer())]),
+            m.Call(args=[m.ZeroOrMore(m.Arg(m.Integer())), m.AtMostN(n=1)]),
+            m.OneOf(
+                m.Name("self"),
+                m.Attribute(attr=m.Name("bar")),
+                m.Call(func=m.Name("foo")),
+                m.Param(),
+                ~m.Integer(),
+            ),
+            m.OneOf(m.Arg(keyword=m.Name("b")), m.Arg(), m.MatchIfTrue(callable)),
+            m.AllOf(m.Name(), m.MatchIfTrue(callable), m.Attribute()),
+            m.AllOf(m.Arg(keyword=None), ~m.Arg(m.Name()), m.Arg(comma=m.DoNotCare())),
+        )
+        for matcher in matchers:
+            for node in nodes:
+                with self.subTest(matcher=matcher, node=node):
+                    self.assertEqual(
+                        matches(node, matcher), m.extract(node, matcher) is not None
+                    )
+
+    def test_matches_exact_node_class(self) -> None:
+        # Matchers match the LibCST node class that they are named after, and not
+        # subclasses of it, even when a subclass has the same name.
+        class Name(cst.Name):
+            pass
+
+        node = Name("foo")
+        self.assertTrue(matches(cst.Name("foo"), m.Name("foo")))
+        self.assertFalse(matches(node, m.Name("foo")))
+        self.assertFalse(matches(node, m.Name("foo") | m.Attribute()))
+        self.assertFalse(matches(node, m.Name() & ~m.Attribute()))
+        self.assertIsNone(m.extract(node, m.SaveMatchedNode(m.Name(), "name")))
+        self.assertFalse(matches(cst.Expr(node), m.Expr(value=m.Name())))
+        self.assertEqual(m.findall(cst.Expr(node), m.Name()), [])
+
+    def test_duplicate_options_are_dropped(self) -> None:
+        true = m.Name("True")
+        false = m.Name("False")
+        oneof = true | false
+        self.assertEqual(m.OneOf(true, false, true).options, (true, false))
+        self.assertTrue((oneof | true) is oneof)
+        self.assertEqual((oneof | m.OneOf(false, m.Name())).options[:2], (true, false))
+        allof = m.Name() & true
+        self.assertTrue((allof & true) is allof)
+        self.assertEqual(len(m.AllOf(allof, true).options), 2)
+        # Dropping the duplicates should not change the result of a match.
+        self.assertTrue(matches(cst.Name("True"), m.OneOf(true, false, true)))
+        self.assertFalse(matches(cst.Name("False"), m.AllOf(true, m.Name(), true)))
+
+    def test_cheap_options_are_tried_first(self) -> None:
+        call = m.Call(func=m.Name("a") | m.Name("b"))
+        oneof = m.OneOf(call, m.Name("c"), "x")
+        # The options we report are untouched, but plain values are tried before
+        # concrete matchers, which are tried before ones that branch further.
+        self.assertEqual(oneof.options, (call, m.Name("c"), "x"))
+        self.assertEqual(oneof._match_options, ("x", m.Name("c"), call))
+        # Anything that captures or calls user code must be tried in order.
+        saved = m.SaveMatchedNode(m.Call(), "call")
+        self.assertEqual(
+            m.OneOf(saved, m.Name("c"))._match_options, (saved, m.Name("c"))
+        )
+        expression = cst.parse_expression("foo()")
+        self.assertEqual(
+            m.extract(
+                expression,
+                m.OneOf(
+                    m.SaveMatchedNode(m.Call(func=m.Name() | m.Attribute()), "first"),
+                    m.SaveMatchedNode(m.Call(), "second"),
+                ),
+            ),
+            {"first": expression},
+        )
+
+    def test_identical_matchers_are_interned(self) -> None:
+        self.assertTrue(m.Name("True") is m.Name("True"))
+        self.assertTrue(m.Arg(m.Name(value="x")) is m.Arg(m.Name(value="x")))
+        self.assertFalse(m.Name("True") is m.Name("False"))
+        # Unhashable arguments can't be interned.
+        self.assertFalse(m.Call(args=[m.Arg()]) is m.Call(args=[m.Arg()]))
+        # Copies must be new instances so that they never clobber the original.
+        original = m.Name("True")
+        duplicate = copy.deepcopy(original)
+        self.assertFalse(duplicate is original)
+        self.assertEqual(duplicate.value, "True")
+        self.assertTrue(m.Name("True") is original)
+        # Handing out an interned matcher doesn't set it up again, so state that
+        # was computed for it so far is kept.
+        self.assertTrue(m.matches(cst.Name("True"), original))
+        fields = original._match_fields
+        compiled = original._compiled
+        self.assertTrue(m.Name("True") is original)
+        self.assertTrue(original._match_fields is fields)
+        self.assertTrue(original._compiled is compiled)
+        # Only concrete matchers are interned, the special matchers aren't.
+        either = m.Name("True") | m.Name("False")
+        self.assertFalse(either is m.Name("True") | m.Name("False"))
+        self.assertTrue(~~either is either)
+
+    def test_special_matchers_compare_structurally(self) -> None:
+        def is_true(value: object) -> bool:
+            return value == "True"
+
+        pairs = (
+            (lambda: m.Name("True") | m.Name("False")),
+            (lambda: m.Name("True") & m.Name(value="True")),
+            (lambda: m.DoesNotMatch(m.Name("True"))),
+            (lambda: m.SaveMatchedNode(m.Name("True"), "name")),
+            (lambda: m.MatchIfTrue(is_true)),
+            (lambda: ~m.MatchIfTrue(is_true)),
+            (lambda: m.MatchMetadata(meta.PositionProvider, None)),
+            (lambda: m.MatchMetadataIfTrue(meta.PositionProvider, is_true)),
+            (lambda: m.ZeroOrMore(m.Name("True"))),
+            (lambda: m.AtMostN(m.Name("True"), n=2)),
+        )
+        for build in pairs:
+            first, second = build(), build()
+            with self.subTest(matcher=first):
+                self.assertEqual(first, second)
+                self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(m.Name("True") | m.Name("False"), m.Name("True"))
+        self.assertNotEqual(m.MatchIfTrue(is_true), ~m.MatchIfTrue(is_true))
+        self.assertNotEqual(m.ZeroOrMore(m.Name()), m.ZeroOrOne(m.Name()))
+        # Concrete matchers that contain equal OneOf and AllOf matchers are
+        # interned, even though the OneOf and AllOf matchers themselves aren't.
+        self.assertTrue(
+            m.Call(func=m.Name("foo") | m.Attribute(attr=m.Name("foo")))
+            is m.Call(func=m.Name("foo") | m.Attribute(attr=m.Name("foo")))
+        )
+
+    def test_special_matchers_hash_unhashable_values(self) -> None:
+        class Predicate:
+            # Defining __eq__ without __hash__ makes instances unhashable.
+            def __eq__(self, other: object) -> bool:
+                return isinstance(other, Predicate)
+
+            def __call__(self, value: object) -> bool:
+                return True
+
+        names = {meta.QualifiedName(name="a.b", source=meta.QualifiedNameSource.IMPORT)}
+        predicate = Predicate()
+        matchers = (
+            m.MatchMetadata(meta.QualifiedNameProvider, names),
+            m.MatchIfTrue(predicate),
+            m.MatchMetadataIfTrue(meta.QualifiedNameProvider, predicate),
+        )
+        for matcher in matchers:
+            with self.subTest(matcher=matcher):
+                self.assertEqual(hash(matcher), hash(copy.copy(matcher)))
+                self.assertEqual(matcher, copy.copy(matcher))
+        # Unhashable values are compared by identity.
+        self.assertNotEqual(
+            m.MatchMetadata(meta.QualifiedNameProvider, names),
+            m.MatchMetadata(meta.QualifiedNameProvider, set(names)),
+        )
+        self.assertNotEqual(m.MatchIfTrue(predicate), m.MatchIfTrue(Predicate()))
+
+    def test_sequence_length_bounds(self) -> None:
+        call = cst.Call(
+            func=cst.Name("foo"),
+            args=tuple(cst.Arg(cst.Integer(str(i))) for i in range(30)),
+        )
+        # Too few nodes for the wildcards and concrete matchers to consume.
+        self.assertFalse(
+            matches(
+                call,
+                m.Call(
+                    args=[
+                        *(m.ZeroOrMore() for _ in range(10)),
+                        m.AtLeastN(n=31),
+                        *(m.ZeroOrMore() for _ in range(10)),
+                    ]
+                ),
+            )
+        )
+        # Too many nodes for the wildcards and concrete matchers to consume.
+        self.assertFalse(
+            matches(
+                call,
+                m.Call(args=[*(m.ZeroOrOne() for _ in range(20)), m.AtMostN(n=9)]),
+            )
+        )
+        # Exactly enough nodes, including ones consumed by a capture.
+        self.assertTrue(
+            matches(
+                call,
+                m.Call(
+                    args=[
+                        *(m.ZeroOrOne() for _ in range(20)),
+                        m.SaveMatchedNode(m.AtMostN(n=8), "rest"),
+                        m.Arg(),
+                        m.AtLeastN(n=0),
+                    ]
+                ),
+            )
+        )
+
+    def test_long_sequences(self) -> None:
+        # Wildcards consume nodes in a loop, so a long sequence doesn't run into
+        # the recursion limit.
+        call = cst.Call(
+            func=cst.Name("foo"),
+            args=tuple(cst.Arg(cst.Integer(str(i))) for i in range(2000)),
+        )
+        self.assertTrue(
+            matches(call, m.Call(args=[m.ZeroOrMore(m.Arg(m.Integer())), m.Arg()]))
+        )
+        self.assertTrue(
+            matches(call, m.Call(args=[m.AtLeastN(n=1000), m.AtMostN(n=1000)]))
+        )
+        self.assertFalse(
+            matches(call, m.Call(args=[m.AtMostN(n=999), m.AtMostN(n=1000)]))
+        )
+        # Neither do long runs of matchers that consume exactly one node each.
+        self.assertTrue(
+            matches(
+                call,
+                m.Call(
+                    args=[*(m.DoNotCare() for _ in range(1999)), m.Arg(m.Integer())]
+                ),
+            )
+        )
+        self.assertEqual(
+            m.extract(
+                call, m.Call(args=[m.ZeroOrMore(), m.SaveMatchedNode(m.Arg(), "last")])
+            ),
+            {"last": call.args[-1:]},
+        )
+
+    def test_wrapper_attributes_are_transparent(self) -> None:
+        inner = m.FunctionDef(name=m.Name("foo"))
+        inverse = m.DoesNotMatch(inner)
+        self.assertTrue(inverse.name is inner.name)
+        self.assertTrue(inverse.body is inner.body)
+        saved = m.SaveMatchedNode(inner, "func")
+        # The capture's own name takes precedence over the wrapped matcher's.
+        self.assertEqual(saved.name, "func")
+        self.assertTrue(saved.body is inner.body)
+        # Attributes of special matchers are still looked up on demand.
+        self.assertEqual(len(m.SaveMatchedNode(m.Name() | m.Arg(), "x").options), 2)
+
+    def test_special_matchers_are_slotted(self) -> None:
+        for matcher in (
+            m.OneOf(m.Name("a"), m.Name("b")),
+            m.AllOf(m.Name(), m.Name("b")),
+            m.AtLeastN(n=1),
+            m.AtMostN(m.Arg(), n=2),
+            m.MatchIfTrue(lambda value: True),
+            m.MatchMetadata(meta.PositionProvider, None),
+            m.MatchMetadataIfTrue(meta.PositionProvider, lambda value: True),
+        ):
+            with self.subTest(matcher=matcher):
+                self.assertFalse(hasattr(matcher, "__dict__"))
+                self.assertTrue(weakref.ref(matcher)() is matcher)
+
+    def test_match_fields_skip_unconstrained_attributes(self) -> None:
+        # Only attributes that constrain a match are visited per node, and the
+        # metadata attribute is kept apart from the rest.
+        matcher = m.Call(
+            func=m.Name("foo"),
+            args=[m.DoNotCare()],
+            metadata=m.MatchMetadata(meta.PositionProvider, None),
+        )
+        self.assertEqual(
+            [name for name, _, _ in matcher._match_fields], ["func", "args"]
+        )
+        self.assertEqual(
+            matcher._match_metadata, m.MatchMetadata(meta.PositionProvider, None)
+        )
+        # Plain values are compared before anything that walks into the node.
+        self.assertEqual(
+            [name for name, _, _ in m.Arg(m.Name(), keyword=None)._match_fields],
+            ["keyword", "value"],
+        )
+        self.assertEqual(m.Name()._match_fields, ())
+        self.assertIs(m.Name()._match_metadata, m.DoNotCare())
@@ -281,3 +281,31 @@ class MatchersReplaceTest(UnitTest):
             replaced,
             "def foo(val: int) -> int:\n    return val\nbar = foo\nbaz = foo\nbiz = foo\nfoo(bar_immediate)\n",
         )
+
+    def test_replace_skipped_subtrees(self) -> None:
+        # Nothing under a Name can be a Call, so those subtrees are skipped, but
+        # the extracted Name must still be handed to the replacement.
+        original = cst.parse_module("foo(bar(1), baz.biz(2))\n")
+        replaced = cst.ensure_type(
+            m.replace(
+                original,
+                m.Call(func=m.SaveMatchedNode(m.Name(), "func")),
+                lambda node, extraction: cst.ensure_type(
+                    extraction["func"], cst.Name
+                ).with_changes(value="replaced"),
+            ),
+            cst.Module,
+        ).code
+        self.assertEqual(replaced, "replaced\n")
+
+        # Although a node that was replaced no longer counts towards a match.
+        original = cst.parse_module("foo(bar, baz(1))\n")
+        replaced = cst.ensure_type(
+            m.replace(
+                original,
+                m.Name("foo") | m.Call(func=m.SaveMatchedNode(m.Name(), "func")),
+                lambda node, extraction: cst.Name("replaced"),
+            ),
+            cst.Module,
+        ).code
+        self.assertEqual(replaced, "replaced(bar, replaced)\n")
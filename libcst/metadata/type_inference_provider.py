@@ -6,13 +6,14 @@
 # pyre-strict
 import json
 import subprocess
+import sys
 from pathlib import Path
 from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 from mypy_extensions import TypedDict
 
 import libcst as cst
-from libcst._position import CodePosition, CodeRange
+from libcst._position import CodeRange
 from libcst.metadata.base_provider import BatchableMetadataProvider
 from libcst.metadata.position_provider import PositionProvider
 
@@ -74,23 +75,31 @@ class TypeInferenceProvider(BatchableMetadataProvider[str]):
 
     def __init__(self, cache: PyreData) -> None:
         super().__init__(cache)
-        lookup: Dict[CodeRange, str] = {}
-        for item in cache["types"]:
-            location = item["location"]
-            start = location["start"]
-            end = location["stop"]
-            lookup[
-                CodeRange(
-                    start=CodePosition(start["line"], start["column"]),
-                    end=CodePosition(end["line"], end["column"]),
-                )
-            ] = item["annotation"]
-        self.lookup: Dict[CodeRange, str] = lookup
+        # Keyed on the start line, start column, end line and end column of each
+        # range, see _position_key, since a tuple of ints hashes much faster than a
+        # CodeRange. _parse_metadata builds the same tuple from a node's range. The
+        # same few annotations come up over and over again, so intern them rather
+        # than keeping a separate copy of each one from the JSON response.
+        self.lookup: Dict[Tuple[int, int, int, int], str] = {
+            _position_key(item): sys.intern(item["annotation"])
+            for item in cache["types"]
+        }
 
     def _parse_metadata(self, node: cst.CSTNode) -> None:
-        range = self.get_metadata(PositionProvider, node)
-        if range in self.lookup:
-            self.set_metadata(node, self.lookup.pop(range))
+        lookup = self.lookup
+        if not lookup:
+            # Every inferred type has been assigned to a node already, so don't
+            # bother looking up this node's position.
+            return
+        # PositionProvider is our own dependency, so we can skip the checks that
+        # get_metadata does for every node.
+        # pyre-ignore[9] PositionProvider always provides a CodeRange.
+        range: CodeRange = self.metadata[PositionProvider][node]
+        start = range.start
+        end = range.end
+        annotation = lookup.pop((start.line, start.column, end.line, end.column), None)
+        if annotation is not None:
+            self.set_metadata(node, annotation)
 
     def visit_Name(self, node: cst.Name) -> Optional[bool]:
         self._parse_metadata(node)
@@ -101,6 +110,11 @@ class TypeInferenceProvider(BatchableMetadataProvider[str]):
     def visit_Call(self, node: cst.Call) -> Optional[bool]:
         self._parse_metadata(node)
 
+    def leave_Module(self, original_node: cst.Module) -> None:
+        # Whatever is left over didn't line up with any node, so there's no need to
+        # hold on to it while the rest of the metadata is collected.
+        self.lookup.clear()
+
 
 def run_command(command: str, timeout: Optional[int] = None) -> Tuple[str, str, int]:
     process = subprocess.Popen(
@@ -116,10 +130,12 @@ class RawPyreData(TypedDict):
 
 
 def _process_pyre_data(data: RawPyreData) -> PyreData:
-    return {"types": sorted(data["types"], key=_sort_by_position)}
+    return {"types": sorted(data["types"], key=_position_key)}
 
 
-def _sort_by_position(data: InferredType) -> Tuple[int, int, int, int]:
+def _position_key(data: InferredType) -> Tuple[int, int, int, int]:
+    # Both the order of inferred types and the keys of the lookup in
+    # TypeInferenceProvider come from here, so keep them in sync.
     start = data["location"]["start"]
     stop = data["location"]["stop"]
     return start["line"], start["column"], stop["line"], stop["column"]
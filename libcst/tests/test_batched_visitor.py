@@ -71,3 +71,42 @@ class BatchedVisitorTest(UnitTest):
         mock.leave_Pass.assert_called_once()
         mock.visit_Pass_semicolon.assert_called_once()
         mock.leave_Pass_semicolon.assert_called_once()
+
+    def test_repeated_visits(self) -> None:
+        names = []
+        attributes = []
+
+        class Batchable(BatchableCSTVisitor):
+            def visit_Name(self, node: cst.Name) -> None:
+                names.append(("visit", node.value))
+
+            def leave_Name(self, original_node: cst.Name) -> None:
+                names.append(("leave", original_node.value))
+
+            def visit_Assign_value(self, node: cst.Assign) -> None:
+                attributes.append("visit_value")
+
+            def leave_Assign_targets(self, node: cst.Assign) -> None:
+                attributes.append("leave_targets")
+
+        visit_batched(parse_module("a = b\nc = d(e)\n"), [Batchable()])
+
+        # Every node of each class gets dispatched to, not just the first one.
+        self.assertEqual(
+            names,
+            [
+                ("visit", "a"),
+                ("leave", "a"),
+                ("visit", "b"),
+                ("leave", "b"),
+                ("visit", "c"),
+                ("leave", "c"),
+                ("visit", "d"),
+                ("leave", "d"),
+                ("visit", "e"),
+                ("leave", "e"),
+            ],
+        )
+        self.assertEqual(
+            attributes, ["leave_targets", "visit_value", "leave_targets", "visit_value"]
+        )